@@ -0,0 +1,132 @@
+import argparse
+import csv
+import time
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from scripts import config
+from scripts.scraping import get_leagues_data, get_teams_data, get_congestion_index, get_head_to_head_index
+from dash_app.utils.helpers import format_data_to_table, format_conditional_styling
+from dash_app.utils.export import write_matches_excel
+from dash_app.utils.info import leagues
+
+"""
+Builds the comparison tables for a whole fixture list without the Dash app.
+
+Fixture file has one match per line as: league, home team, away team
+Lines starting with # are ignored.
+
+Usage: python batch.py fixtures.csv -o matcher.xlsx
+"""
+
+
+@contextmanager
+def stage(name: str, timings: dict):
+    """Times the block and stores the duration in seconds in timings[name]."""
+    start = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - start
+
+
+def read_fixtures(path: str) -> list[tuple[str, str, str]]:
+    """Returns list of (league, home team, away team) from the fixture file."""
+    fixtures = []
+
+    with open(path, newline='', encoding='utf-8') as f:
+        for line_number, row in enumerate(csv.reader(f, skipinitialspace=True), start=1):
+            if row == [] or row[0].startswith('#'):
+                continue
+
+            if len(row) != 3:
+                raise ValueError(f"Line {line_number}: expected league, home team, away team, got {row}")
+
+            league, home_team, away_team = (value.strip() for value in row)
+
+            if league not in config.LEAGUE_SLUG or league not in leagues:
+                raise ValueError(f"Line {line_number}: unknown league {league}")
+
+            # The teams the app lets the user pick in the league, a team of another
+            # league would be looked up in the wrong table
+            for team in (home_team, away_team):
+                if team not in leagues[league]:
+                    raise ValueError(f"Line {line_number}: unknown team {team} in {league}")
+
+            fixtures.append((league, home_team, away_team))
+
+    return fixtures
+
+
+def playable_fixtures(fixtures: list[tuple[str, str, str]], snapshots: dict) -> tuple[list, list]:
+    """Returns the fixtures whose teams are both in the total table of their league snapshot, and the others."""
+    playable, skipped = [], []
+
+    for league, home_team, away_team in fixtures:
+        table = snapshots[league].total_table
+        (playable if home_team in table.index and away_team in table.index else skipped).append((league, home_team, away_team))
+
+    return playable, skipped
+
+
+def format_fixture(args: tuple) -> tuple:
+    """Returns table data and conditional styling of one fixture, runs on the process pool."""
+    home_team, away_team, snapshot, home_data, away_data, head_to_head, congestion, today = args
+
+    data = (home_team, away_team, snapshot.total_table, snapshot.home_table, snapshot.away_table, snapshot.last_five_games,
+            home_data['coach'], away_data['coach'], head_to_head, congestion, today)
+
+    return format_data_to_table(*data), format_conditional_styling(*data)
+
+
+def run_batch(fixtures_path: str, output_path: str, processes: int) -> dict:
+    """Builds the excel doc for all fixtures, returns the time spent per stage."""
+    timings = {}
+
+    with stage('read fixtures', timings):
+        fixtures = read_fixtures(fixtures_path)
+
+    # Every league and team is fetched once no matter how many fixtures it appears in
+    with stage('fetch leagues', timings):
+        snapshots = get_leagues_data(list(dict.fromkeys(league for league, _, _ in fixtures)))
+
+        # A league page that could not be fetched has empty tables, and a team missing
+        # from the table would fail on the process pool, so those fixtures are left out
+        fixtures, skipped = playable_fixtures(fixtures, snapshots)
+
+        for league, home_team, away_team in skipped:
+            print(f"Skipping {home_team} - {away_team}: not in the {league} table")
+
+    with stage('fetch teams', timings):
+        teams_data = get_teams_data(list(dict.fromkeys(team for _, home, away in fixtures for team in (home, away))))
+
+        # One congestion and head-to-head index per league, shared by all its fixtures
+        league_teams = {league: [team for fixture_league, home, away in fixtures if fixture_league == league for team in (home, away)] for league in snapshots}
+        congestion = {league: get_congestion_index(league, teams) for league, teams in league_teams.items()}
+        head_to_head = {league: get_head_to_head_index(league, teams) for league, teams in league_teams.items()}
+        today = date.today()
+
+    with stage('format tables', timings):
+        args = [(home, away, snapshots[league], teams_data[home], teams_data[away], head_to_head[league], congestion[league], today) for league, home, away in fixtures]
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            matches = list(pool.map(format_fixture, args, chunksize=max(1, len(args) // (4 * processes))))
+
+    with stage('write excel', timings):
+        # Many fixtures, so rows are flushed to disk as they are written instead of kept in memory
+        write_matches_excel(matches, output_path, constant_memory=True)
+
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds comparison tables for a fixture list as an excel doc.")
+    parser.add_argument('fixtures', help="file with one 'league, home team, away team' per line")
+    parser.add_argument('-o', '--output', default='matcher.xlsx', help="excel file to write (default: matcher.xlsx)")
+    parser.add_argument('-p', '--processes', type=int, default=4, help="processes formatting tables (default: 4)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    timings = run_batch(args.fixtures, args.output, args.processes)
+
+    for name, seconds in timings.items():
+        print(f"{name:<15} {seconds:8.3f} s")
+    print(f"{'total':<15} {time.perf_counter() - start:8.3f} s")
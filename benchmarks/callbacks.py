@@ -0,0 +1,252 @@
+import json
+import os
+from collections import Counter
+
+# Keep the load test from scraping in the background
+os.environ.setdefault("WARMUP_ENABLED", "0")
+os.environ.setdefault("SNAPSHOT_DB", "")
+os.environ.setdefault("SNAPSHOT_ARCHIVE", "")
+
+from flask import request
+from plotly.utils import PlotlyJSONEncoder
+from dash_app.main import app, serve_layout
+from scripts.scraping import cache_league_snapshot, cache_team_snapshot
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot
+from .fixtures import league_page, team_page
+
+"""
+Counts the server requests a session makes on a page with 50 matches.
+
+Drives the app with the Flask test client as the Dash renderer does. Every UI event
+of a session (add 50 matches, pick league and teams in each, remove 10) sets props
+of the page. Every server callback with a changed input is posted to
+/_dash-update-component, and the props in its response fire the callbacks
+depending on them. The requests are counted as the server receives them.
+
+Callbacks with a clientside function run in the browser and are only counted, their
+outputs are followed to the callbacks depending on them without values. The league
+and team pages written by benchmarks.fixtures are put in the cache, nothing is scraped.
+
+Run with: python -m benchmarks.callbacks
+"""
+
+league = 'Premier League'
+home_team, away_team = 'Arsenal', 'Chelsea'
+
+n_matches = 50
+n_removed = 10
+
+# Requests received on the callback route per registered output
+server_requests = Counter()
+
+
+@app.server.before_request
+def count_request():
+    if request.path.endswith('/_dash-update-component'):
+        server_requests[request.get_json()['output']] += 1
+
+
+def component_key(component_id) -> str:
+    """Returns the id as Dash writes it in responses, pattern matching ids as sorted JSON."""
+    return json.dumps(component_id, sort_keys=True, separators=(',', ':')) if isinstance(component_id, dict) else component_id
+
+
+def read_id(component_id: str):
+    """Returns the id of a registered callback dependency, a dict for pattern matching ids."""
+    return json.loads(component_id) if component_id.startswith('{') else component_id
+
+
+def parse_outputs(output: str) -> list[tuple]:
+    """Returns (id, property) of every output of a registered callback."""
+    outputs = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [(read_id(item.rsplit('.', 1)[0]), item.rsplit('.', 1)[1].split('@')[0]) for item in outputs]
+
+
+def components(tree):
+    """Yields the props of every component with an id in a layout, or a Patch, as JSON."""
+    if isinstance(tree, dict):
+        if isinstance(tree.get('props'), dict):
+            if 'id' in tree['props']:
+                yield tree['props']
+
+            yield from components(tree['props'].get('children'))
+
+        else:
+            for value in tree.values():
+                yield from components(value)
+
+    elif isinstance(tree, list):
+        for item in tree:
+            yield from components(item)
+
+
+def callbacks() -> list[dict]:
+    return [
+        {
+            'output': callback['output'],
+            'clientside': callback.get('clientside_function') is not None,
+            'prevent_initial_call': callback.get('prevent_initial_call'),
+            'inputs': [(read_id(i['id']), i['property']) for i in callback['inputs']],
+            'state': [(read_id(s['id']), s['property']) for s in callback['state']],
+            'outputs': parse_outputs(callback['output']),
+        }
+        for callback in app._callback_list
+    ]
+
+
+class Session:
+    """Props of one page and the callbacks they fire, updated from the responses of the server."""
+
+    def __init__(self, client):
+        self.client = client
+        self.graph = callbacks()
+        self.clientside = Counter()
+
+        # component key -> id, (component key, property) -> value
+        self.ids = {}
+        self.props = {}
+
+        layout = json.loads(json.dumps(serve_layout(), cls=PlotlyJSONEncoder))
+        self.dispatch(set(), self.add(layout), initial=True)
+
+    def add(self, tree) -> list[str]:
+        """Adds the components in tree to the page, returns their keys."""
+        added = []
+        for props in components(tree):
+            key = component_key(props['id'])
+            self.ids[key] = props['id']
+            self.props.update({(key, prop): value for prop, value in props.items() if prop != 'children'})
+            added.append(key)
+
+        return added
+
+    def resolve(self, component_id, match: dict) -> list:
+        """Returns the ids of the page matching a dependency id, with MATCH taken from match."""
+        if not isinstance(component_id, dict):
+            return [component_id]
+
+        wanted = {key: match.get(key) if value == ['MATCH'] else value for key, value in component_id.items()}
+
+        return [
+            found for found in self.ids.values()
+            if isinstance(found, dict) and found.keys() == wanted.keys()
+            and all(value == ['ALL'] or found[key] == value for key, value in wanted.items())
+        ]
+
+    def triggered(self, changed: set, added: list, initial: bool) -> list[tuple[dict, dict]]:
+        """Returns (callback, MATCH values) of every callback fired by the changed props and added components."""
+        fired = []
+
+        for callback in self.graph:
+            for component_id, prop in callback['inputs']:
+                for key in {key for key, changed_prop in changed if changed_prop == prop} | set(added):
+                    found = self.ids[key]
+
+                    if found not in self.resolve(component_id, found if isinstance(found, dict) else {}):
+                        continue
+
+                    wildcards = isinstance(component_id, dict) and ['ALL'] in component_id.values()
+
+                    # A changed input fires, an added component only an initial call or an ALL input
+                    if (key, prop) in changed or wildcards or (not callback['prevent_initial_call'] and (initial or key in added)):
+                        match = {k: found[k] for k, v in component_id.items() if v == ['MATCH']} if isinstance(component_id, dict) else {}
+
+                        if (callback, match) not in fired:
+                            fired.append((callback, match))
+
+        return fired
+
+    def dependencies(self, dependencies: list, match: dict) -> list:
+        values = []
+        for component_id, prop in dependencies:
+            found = [{'id': found, 'property': prop, 'value': self.props.get((component_key(found), prop))}
+                     for found in self.resolve(component_id, match)]
+
+            values.append(found if isinstance(component_id, dict) and ['ALL'] in component_id.values() else found[0])
+
+        return values
+
+    def post(self, callback: dict, match: dict, changed: set) -> dict:
+        """Posts the callback with the props of the page, returns the props in the response."""
+        outputs = [{'id': self.resolve(component_id, match)[0], 'property': prop} for component_id, prop in callback['outputs']]
+        inputs = self.dependencies(callback['inputs'], match)
+
+        body = {
+            'output': callback['output'],
+            'outputs': outputs if callback['output'].startswith('..') else outputs[0],
+            'inputs': inputs,
+            'state': self.dependencies(callback['state'], match),
+            'changedPropIds': [f"{component_key(i['id'])}.{i['property']}" for i in inputs
+                               if (component_key(i['id']), i['property']) in changed],
+        }
+
+        response = self.client.post('/_dash-update-component', data=json.dumps(body, cls=PlotlyJSONEncoder), content_type='application/json')
+        assert response.status_code in (200, 204), response.data
+
+        return response.get_json()['response'] if response.status_code == 200 else {}
+
+    def dispatch(self, changed: set, added: list = (), initial: bool = False) -> None:
+        """Runs the callbacks fired by the changed props and added components, then the callbacks fired by their outputs."""
+        while changed or added:
+            fired = self.triggered(changed, list(added), initial)
+            previous, changed, added, initial = changed, set(), [], False
+
+            for callback, match in fired:
+                if callback['clientside']:
+                    self.clientside[callback['output']] += 1
+                    changed |= {(component_key(found), prop) for component_id, prop in callback['outputs'] for found in self.resolve(component_id, match)}
+                    continue
+
+                for key, props in self.post(callback, match, previous).items():
+                    for prop, value in props.items():
+                        # A Patch of children adds components
+                        if prop == 'children' and isinstance(value, dict) and '__dash_patch_update' in value:
+                            added += self.add(value)
+                        else:
+                            self.props[(key, prop)] = value
+                            changed.add((key, prop))
+
+    def set(self, component_id, prop: str, value) -> None:
+        """Sets a prop as a user does in the browser."""
+        key = component_key(component_id)
+        self.props[(key, prop)] = value
+        self.dispatch({(key, prop)})
+
+
+def run() -> Counter:
+    """Runs the session, returns the callbacks handled in the browser per registered output."""
+    session = Session(app.server.test_client())
+
+    for index in range(1, n_matches + 1):
+        session.set('add-team-button', 'n_clicks', index)
+
+    for index in range(1, n_matches + 1):
+        session.set({'type': 'league-dropdown', 'index': index}, 'value', league)
+        session.set({'type': 'home-dropdown', 'index': index}, 'value', home_team)
+        session.set({'type': 'away-dropdown', 'index': index}, 'value', away_team)
+
+    for index in range(1, n_removed + 1):
+        session.set({'type': 'remove-button', 'index': index}, 'n_clicks', 1)
+
+    return session.clientside
+
+
+def name(output: str) -> str:
+    return ', '.join(f"{component_id['type'] if isinstance(component_id, dict) else component_id}.{prop}" for component_id, prop in parse_outputs(output))
+
+
+if __name__ == "__main__":
+    cache_league_snapshot(league, LeagueSnapshot.from_html(league_page()))
+    team = TeamSnapshot.from_html(team_page())
+    cache_team_snapshot(home_team, team)
+    cache_team_snapshot(away_team, team)
+
+    clientside = run()
+
+    print(f"Session with {n_matches} matches, {n_removed} removed")
+    for output, count in server_requests.most_common():
+        print(f"  {count:5d}  {name(output)[:80]}")
+
+    print(f"server requests:           {sum(server_requests.values())}")
+    print(f"handled in the browser:    {sum(clientside.values())}")
+    print(f"server requests if all callbacks ran on the server: {sum(server_requests.values()) + sum(clientside.values())}")
@@ -0,0 +1,83 @@
+import time
+import tracemalloc
+import pandas as pd
+from datetime import date
+from io import BytesIO
+from dash_app.utils.helpers import format_data_to_table, format_conditional_styling, table_style_to_cell_map
+from dash_app.utils.export import matches_to_excel
+from scripts.congestion import CongestionIndex
+from scripts.head_to_head import HeadToHeadIndex
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot
+from .fixtures import league_page, team_page, results_page
+
+"""
+Exports 500 matches with the previous export code and with the export engine.
+
+Run with: python -m benchmarks.export
+"""
+
+n_matches = 500
+
+
+def legacy_matches_to_excel(matches: list) -> bytes:
+    """Previous export: to_excel, then every cell written again with its own format."""
+    styles = table_style_to_cell_map([style for _, style in matches])
+    output = BytesIO()
+    writer = pd.ExcelWriter(output, engine='xlsxwriter')
+
+    for match_number, (df, _) in enumerate(matches):
+        df.to_excel(writer, sheet_name="Sheet1", index=False, header=True, startrow=1 + 5 * match_number)
+        workbook = writer.book
+        worksheet = writer.sheets["Sheet1"]
+        worksheet.write(match_number * 5, 0, f"Match {match_number + 1}", workbook.add_format({'bold': True}))
+
+        values = df.values
+        for row in range(values.shape[0]):
+            for col in range(values.shape[1]):
+                color = workbook.add_format()
+                color.set_bg_color(styles[match_number, row, col])
+                worksheet.write(row + 2 + 5 * match_number, col, values[row, col], color)
+
+    worksheet.autofit()
+    writer.close()
+
+    return output.getvalue()
+
+
+def make_matches(n: int) -> list:
+    """Returns n (table data, style) pairs as they arrive from the tables in the app."""
+    league = LeagueSnapshot.from_html(league_page())
+    team = TeamSnapshot.from_html(team_page())
+    teams = list(league.total_table['name'])
+    congestion = CongestionIndex({name: team.match_dates for name in teams})
+    head_to_head = HeadToHeadIndex({teams[0]: ResultsSnapshot.from_html(results_page(teams[0])).results})
+
+    matches = []
+    for i in range(n):
+        home_team, away_team = teams[i % len(teams)], teams[(i + 1) % len(teams)]
+        args = (home_team, away_team, league.total_table, league.home_table, league.away_table, league.last_five_games,
+                team.coach, team.coach, head_to_head, congestion, date.today())
+        df = format_data_to_table(*args)
+        matches.append((pd.DataFrame(df.to_dict('records')), format_conditional_styling(*args)))
+
+    return matches
+
+
+def measure(name: str, export, matches: list) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = len(export(matches))
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<28} {seconds:6.2f} s  peak {peak / 2 ** 20:7.1f} MiB  file {size / 2 ** 10:7.0f} KiB")
+
+
+if __name__ == "__main__":
+    matches = make_matches(n_matches)
+
+    print(f"Exporting {n_matches} matches")
+    measure("previous export", legacy_matches_to_excel, matches)
+    measure("export engine", matches_to_excel, matches)
+    measure("export engine, constant mem", lambda m: matches_to_excel(m, constant_memory=True), matches)
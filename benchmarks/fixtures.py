@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+from scripts.config import PREMIER_LEAGUE_SLUG
+
+"""
+Synthetic league, team and results pages with the same structure as the scraped site.
+
+The pages include navigation and footer filler so the parser has to walk
+roughly as much markup as on a real page.
+"""
+
+results = ['win', 'draw', 'lose']
+
+
+def league_teams(n_teams: int = 20) -> list[str]:
+    """Returns n_teams team names, cycling through the Premier League names."""
+    names = list(PREMIER_LEAGUE_SLUG.keys())
+    return [names[i % len(names)] if i < len(names) else f"{names[i % len(names)]} {i}" for i in range(n_teams)]
+
+
+def scoreboard_html(teams: list[str], offset: int = 0) -> str:
+    """Returns a div.table-body.table-custom.competition-result scoreboard."""
+    rows = []
+    for i, team in enumerate(teams):
+        rows.append(
+            f'<tr class="row-body"><td><div>{i + 1}</div></td><td><img src="shield.png"></td>'
+            f'<td class="name"><span>{team}</span></td><td>{90 - 2 * i + offset}</td><td>\n{38}\n</td>'
+            f'<td>{28 - i // 2}</td><td>{6}</td><td>{4 + i // 2}</td><td>{80 - i + offset}</td><td>{30 + i}</td></tr>'
+        )
+
+    return '<div class="table-body table-custom competition-result"><table class="table-standings">' + ''.join(rows) + '</table></div>'
+
+
+def league_page(n_teams: int = 20) -> str:
+    """Returns a league page with form table and total, home and away scoreboards."""
+    teams = league_teams(n_teams)
+
+    form_rows = []
+    for i, team in enumerate(teams):
+        spans = ''.join(f'<span class="bg-match-res {results[(i + k) % 3]}">{"WDL"[(i + k) % 3]}</span>' for k in range(5))
+        form_rows.append(f'<tr><td class="name"><span class="team-name">{team}</span>{spans}</td></tr>')
+
+    return (
+        '<html><head>' + '<script>var ads = [];</script>' * 40 + '</head><body>'
+        + '<nav>' + '<a href="#" class="menu-item">Link</a>' * 400 + '</nav>'
+        + '<table class="table">' + ''.join(form_rows) + '</table>'
+        + scoreboard_html(teams) + scoreboard_html(teams, -40) + scoreboard_html(teams, -50)
+        + '<footer>' + '<div class="ad"><p>Advertisement</p></div>' * 600 + '</footer>'
+        + '</body></html>'
+    )
+
+
+def team_page(today: date = None) -> str:
+    """Returns a team page with recent match dates and coach statistics."""
+    today = today or date.today()
+
+    dates = ''.join(
+        f'<div class="spree-item"><div class="date color-grey2">{(today - timedelta(days=days)).strftime("%d %b.")}</div></div>'
+        for days in (2, 6, 9, 13, 20)
+    )
+
+    return (
+        '<html><head>' + '<script>var ads = [];</script>' * 40 + '</head><body>'
+        + '<nav>' + '<a href="#" class="menu-item">Link</a>' * 400 + '</nav>'
+        + '<div class="spree-content">' + dates + '</div>'
+        + '<div id="mod_coachStats"><p class="mb5">Coach Name</p>'
+        + '<div class="main-line mt10 mb5">100</div><div class="main-line mt10 mb5">50</div>'
+        + '<div class="main-line mt10 mb5">25</div><div class="main-line mt10 mb5">25</div></div>'
+        + '<footer>' + '<div class="ad"><p>Advertisement</p></div>' * 600 + '</footer>'
+        + '</body></html>'
+    )
+
+
+def results_page(team: str = None, n_teams: int = 20, seasons: int = 3, today: date = None) -> str:
+    """Returns the results page of team with a home and away match against every other team per season."""
+    teams = league_teams(n_teams)
+    team = team or teams[0]
+    today = today or date.today()
+
+    rows = []
+    for season in range(seasons):
+        for i, opponent in enumerate(opponent for opponent in teams if opponent != team):
+            for home, away, days in ((team, opponent, 7 * i + 1), (opponent, team, 7 * i + 180)):
+                played = today - timedelta(days=365 * season + days)
+                rows.append(
+                    f'<tr class="row-body"><td class="date">{played.strftime("%d/%m/%Y")}</td>'
+                    f'<td class="team-home"><span class="team-name">{home}</span></td>'
+                    f'<td class="marker">{(i + season) % 4} - {(i + days) % 3}</td>'
+                    f'<td class="team-away"><span class="team-name">{away}</span></td></tr>'
+                )
+
+    # Upcoming matches show the kick-off time instead of a score
+    rows += [
+        f'<tr class="row-body"><td class="date">{(today + timedelta(days=7 * k)).strftime("%d/%m/%Y")}</td>'
+        f'<td class="team-home"><span class="team-name">{team}</span></td><td class="marker">15:00</td>'
+        f'<td class="team-away"><span class="team-name">{teams[k % len(teams)]}</span></td></tr>'
+        for k in range(1, 6)
+    ]
+
+    return (
+        '<html><head>' + '<script>var ads = [];</script>' * 40 + '</head><body>'
+        + '<nav>' + '<a href="#" class="menu-item">Link</a>' * 400 + '</nav>'
+        + '<table class="table-results">' + ''.join(rows) + '</table>'
+        + '<footer>' + '<div class="ad"><p>Advertisement</p></div>' * 600 + '</footer>'
+        + '</body></html>'
+    )
@@ -0,0 +1,46 @@
+from datetime import date
+from timeit import timeit
+from dash_app.utils.helpers import format_data_to_table, format_conditional_styling
+from scripts.congestion import CongestionIndex
+from scripts.head_to_head import HeadToHeadIndex
+from scripts.snapshot import LeagueSnapshot
+from .fixtures import league_page
+
+"""
+Compares looking up team values by scanning the name column with the name-indexed scoreboards.
+
+Run with: python -m benchmarks.lookup
+"""
+
+# Number of scoreboard lookups done by format_data_to_table and format_conditional_styling per comparison
+lookups_per_comparison = 24
+
+columns = ['position', 'points', 'wins', 'draws', 'losses', 'scores for', 'scores against']
+
+
+def mask_lookups(df, home_team, away_team) -> None:
+    for i in range(lookups_per_comparison):
+        team = home_team if i % 2 == 0 else away_team
+        df.loc[df['name'] == team, columns[i % len(columns)]].values[0]
+
+
+def indexed_lookups(df, home_team, away_team) -> None:
+    for i in range(lookups_per_comparison):
+        team = home_team if i % 2 == 0 else away_team
+        df.at[team, columns[i % len(columns)]]
+
+
+if __name__ == "__main__":
+    snapshot = LeagueSnapshot.from_html(league_page())
+    home_team, away_team = snapshot.total_table['name'].iloc[[0, -1]]
+    number = 200
+
+    mask_ms = 1000 * timeit(lambda: mask_lookups(snapshot.total_table, home_team, away_team), number=number) / number
+    indexed_ms = 1000 * timeit(lambda: indexed_lookups(snapshot.total_table, home_team, away_team), number=number) / number
+
+    print(f"{lookups_per_comparison} lookups per comparison: {mask_ms:.3f} ms boolean mask -> {indexed_ms:.3f} ms indexed ({mask_ms / indexed_ms:.0f}x)")
+
+    args = (home_team, away_team, snapshot.total_table, snapshot.home_table, snapshot.away_table, snapshot.last_five_games, {}, {}, HeadToHeadIndex({}), CongestionIndex({}), date.today())
+    format_ms = 1000 * timeit(lambda: (format_data_to_table(*args), format_conditional_styling(*args)), number=number) / number
+
+    print(f"format_data_to_table + format_conditional_styling: {format_ms:.3f} ms per comparison")
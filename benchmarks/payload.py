@@ -0,0 +1,77 @@
+import json
+import os
+
+# Keep the benchmark from scraping in the background
+os.environ.setdefault("WARMUP_ENABLED", "0")
+os.environ.setdefault("SNAPSHOT_DB", "")
+os.environ.setdefault("SNAPSHOT_ARCHIVE", "")
+
+from dash_app.main import app
+from dash_app.utils.instrumentation import payload_sizes
+from scripts.scraping import cache_league_snapshot, cache_team_snapshot
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot
+from .fixtures import league_page, team_page
+
+"""
+Measures the callback payloads of one update on pages with 1, 10 and 50 matches.
+
+Sends the requests the browser makes when a match is added, a league is picked and
+a team is picked, with the fixture pages in the cache instead of scraping.
+
+Run with: python -m benchmarks.payload
+"""
+
+league = 'Premier League'
+home_team, away_team = 'Arsenal', 'Chelsea'
+
+
+def registered_output(part: str) -> str:
+    """Returns the output of the callback as registered, with the MATCH / ALL wildcards."""
+    return next(callback['output'] for callback in app._callback_list if part in callback['output'])
+
+
+def post(client, output: str, outputs, inputs: list, state: list = (), changed: list = ()) -> None:
+    body = {'output': output, 'outputs': outputs, 'inputs': inputs, 'state': list(state), 'changedPropIds': list(changed)}
+    response = client.post('/_dash-update-component', data=json.dumps(body), content_type='application/json')
+    assert response.status_code in (200, 204), response.data
+
+
+def update(client, n_matches: int) -> None:
+    """Sends the requests of adding match n_matches and picking its league and teams."""
+    index = n_matches
+
+    post(client, registered_output('component-container.children'), {'id': 'component-container', 'property': 'children'},
+         [{'id': 'add-team-button', 'property': 'n_clicks', 'value': index}], changed=['add-team-button.n_clicks'])
+
+    snapshot = {'type': 'league-snapshot', 'index': index}
+    post(client, registered_output('"type":"league-snapshot"}.data'), {'id': snapshot, 'property': 'data'},
+         [{'id': {'type': 'league-dropdown', 'index': index}, 'property': 'value', 'value': league}],
+         changed=[json.dumps({'index': index, 'type': 'league-dropdown'}, separators=(',', ':')) + '.value'])
+
+    table = {'type': 'table', 'index': index}
+    post(client, registered_output('"type":"table"}.style_data_conditional'),
+         [{'id': table, 'property': 'data'}, {'id': table, 'property': 'style_data_conditional'}],
+         [{'id': {'type': 'home-dropdown', 'index': index}, 'property': 'value', 'value': home_team},
+          {'id': {'type': 'away-dropdown', 'index': index}, 'property': 'value', 'value': away_team},
+          {'id': {'type': 'as-of-date', 'index': index}, 'property': 'date', 'value': None}],
+         [{'id': {'type': 'league-dropdown', 'index': index}, 'property': 'value', 'value': league},
+          {'id': snapshot, 'property': 'data', 'value': None},
+          {'id': 'session-id', 'property': 'data', 'value': 'benchmark'}],
+         changed=[json.dumps({'index': index, 'type': 'away-dropdown'}, separators=(',', ':')) + '.value'])
+
+
+if __name__ == "__main__":
+    cache_league_snapshot(league, LeagueSnapshot.from_html(league_page()))
+    team = TeamSnapshot.from_html(team_page())
+    cache_team_snapshot(home_team, team)
+    cache_team_snapshot(away_team, team)
+
+    client = app.server.test_client()
+
+    print(f"{'matches':>7}  {'callback':<30} {'request B':>10} {'response B':>10}")
+    for n_matches in (1, 10, 50):
+        update(client, n_matches)
+
+        for output, sizes in payload_sizes.items():
+            name = output.split('"type":"')[1].split('"')[0] if '"type"' in output else output
+            print(f"{n_matches:>7}  {name[:30]:<30} {sizes['last request bytes']:>10} {sizes['last response bytes']:>10}")
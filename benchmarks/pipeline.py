@@ -0,0 +1,198 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from timeit import repeat
+import pandas as pd
+from dash_app.utils.helpers import format_data_to_table, format_conditional_styling, table_style_to_cell_map
+from dash_app.utils.export import matches_to_excel
+from scripts.congestion import CongestionIndex
+from scripts.head_to_head import HeadToHeadIndex
+from scripts.scraping import scrape_total_table, scrape_last_five_games
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot
+
+"""
+Times every stage of the scrape -> parse -> format -> export pipeline and the whole pipeline.
+
+Works on the league, team and results pages checked in under benchmarks/pages, no
+network access needed. The pages were written by benchmarks.fixtures with 20 and 24 teams.
+Inputs are scaled to 1, 10 and 100 league pages and 1 to 500 matches.
+
+Every measurement is the median of a few runs. The results are written as JSON and
+can be compared with the results of an earlier run, a stage slower than the
+threshold makes the run exit with status 1.
+
+Run with: python -m benchmarks.pipeline -o results.json
+Compare:  python -m benchmarks.pipeline -o new.json --compare results.json
+"""
+
+pages = Path(__file__).parent / 'pages'
+
+league_pages = ['premier-league.html', 'championship.html']
+team_pages = ['team.html']
+results_pages = ['results.html']
+
+n_leagues = [1, 10, 100]
+n_matches = [1, 10, 100, 500]
+
+
+def read_page(name: str) -> str:
+    return (pages / name).read_text(encoding='utf-8')
+
+
+def league_htmls(n: int) -> list[str]:
+    """Returns n league pages, cycling through the checked-in pages."""
+    htmls = [read_page(name) for name in league_pages]
+    return [htmls[i % len(htmls)] for i in range(n)]
+
+
+def match_args(n: int, league: LeagueSnapshot, team: TeamSnapshot, results: ResultsSnapshot) -> list[tuple]:
+    """Returns the format_data_to_table arguments of n matches between teams of league."""
+    teams = list(league.total_table['name'])
+
+    # Every team played the matches of the checked-in team page
+    congestion = CongestionIndex({name: team.match_dates for name in teams})
+    head_to_head = HeadToHeadIndex({teams[0]: results.results})
+
+    return [
+        (teams[i % len(teams)], teams[(i + 1) % len(teams)], league.total_table, league.home_table, league.away_table,
+         league.last_five_games, team.coach, team.coach, head_to_head, congestion, date.today())
+        for i in range(n)
+    ]
+
+
+def format_matches(args: list[tuple]) -> list[tuple[pd.DataFrame, list]]:
+    """Returns (table data, style) per match, as the tables in the app hold them."""
+    matches = []
+    for match in args:
+        df = format_data_to_table(*match)
+        matches.append((pd.DataFrame(df.to_dict('records')), format_conditional_styling(*match)))
+
+    return matches
+
+
+def end_to_end(n: int, league_html: str, team_html: str, results_html: str) -> bytes:
+    """Parses the pages of n matches with nothing cached, formats the tables and exports them."""
+    args = []
+    for i in range(n):
+        league = LeagueSnapshot.from_html(league_html)
+        home, away = TeamSnapshot.from_html(team_html), TeamSnapshot.from_html(team_html)
+        teams = list(league.total_table['name'])
+        home_team, away_team = teams[i % len(teams)], teams[(i + 1) % len(teams)]
+        congestion = CongestionIndex({home_team: home.match_dates, away_team: away.match_dates})
+        head_to_head = HeadToHeadIndex({home_team: ResultsSnapshot.from_html(results_html).results})
+
+        args.append((home_team, away_team, league.total_table, league.home_table, league.away_table,
+                     league.last_five_games, home.coach, away.coach, head_to_head, congestion, date.today()))
+
+    return matches_to_excel(format_matches(args))
+
+
+def benchmarks() -> list[tuple[str, int, callable]]:
+    """Returns (stage, input size, function) of every measurement."""
+    league_html, team_html, results_html = read_page(league_pages[0]), read_page(team_pages[0]), read_page(results_pages[0])
+    league, team, results = LeagueSnapshot.from_html(league_html), TeamSnapshot.from_html(team_html), ResultsSnapshot.from_html(results_html)
+
+    cases = []
+
+    for n in n_leagues:
+        htmls = league_htmls(n)
+        cases.append(('scrape total table', n, lambda htmls=htmls: [scrape_total_table(html) for html in htmls]))
+        cases.append(('scrape last five games', n, lambda htmls=htmls: [scrape_last_five_games(html) for html in htmls]))
+        cases.append(('parse league snapshot', n, lambda htmls=htmls: [LeagueSnapshot.from_html(html) for html in htmls]))
+
+    cases.append(('parse team snapshot', 1, lambda: TeamSnapshot.from_html(team_html)))
+    cases.append(('parse results snapshot', 1, lambda: ResultsSnapshot.from_html(results_html)))
+    cases.append(('build head to head index', 1, lambda: HeadToHeadIndex({name: results.results for name in league.total_table['name']})))
+
+    for n in n_matches:
+        args = match_args(n, league, team, results)
+        matches = format_matches(args)
+        styles = [style for _, style in matches]
+
+        cases.append(('format data to table', n, lambda args=args: [format_data_to_table(*match) for match in args]))
+        cases.append(('format conditional styling', n, lambda args=args: [format_conditional_styling(*match) for match in args]))
+        cases.append(('table style to cell map', n, lambda styles=styles: table_style_to_cell_map(styles)))
+        cases.append(('export excel', n, lambda matches=matches: matches_to_excel(matches)))
+        cases.append(('end to end', n, lambda n=n: end_to_end(n, league_html, team_html, results_html)))
+
+    return cases
+
+
+def measure(function, runs: int) -> dict:
+    """Returns the median and fastest of runs timings in seconds, a slow function runs fewer times."""
+    first = repeat(function, number=1, repeat=1)
+
+    # Functions taking seconds are not worth timing as often as fast ones
+    timings = first + (repeat(function, number=1, repeat=runs - 1) if first[0] < 1 else [])
+
+    return {'median s': statistics.median(timings), 'min s': min(timings), 'runs': len(timings)}
+
+
+def run(runs: int, stages: list[str] = None) -> dict:
+    """Returns the results of every measurement with the environment they ran in."""
+    results = {}
+
+    for stage, n, function in benchmarks():
+        if stages and stage not in stages:
+            continue
+
+        key = f"{stage} [{n}]"
+        results[key] = {'stage': stage, 'n': n, **measure(function, runs)}
+        print(f"{key:<36} {1000 * results[key]['median s']:10.2f} ms")
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints current against baseline medians, returns the measurements slower than threshold."""
+    regressions = []
+
+    print(f"\n{'measurement':<36} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for key, result in current['results'].items():
+        if key not in baseline['results']:
+            continue
+
+        before, after = baseline['results'][key]['median s'], result['median s']
+        change = after / before - 1
+
+        flag = ''
+        if change > threshold:
+            regressions.append(key)
+            flag = '  slower'
+
+        print(f"{key:<36} {1000 * before:12.2f} {1000 * after:12.2f} {change:+8.1%}{flag}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the scrape -> parse -> format -> export pipeline.")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="results file to write (default: benchmark_results.json)")
+    parser.add_argument('-c', '--compare', help="results file of an earlier run to compare with")
+    parser.add_argument('-t', '--threshold', type=float, default=0.10, help="share a median may grow before it counts as slower (default: 0.10)")
+    parser.add_argument('-r', '--runs', type=int, default=5, help="runs per measurement (default: 5)")
+    parser.add_argument('-s', '--stage', action='append', help="only run this stage, can be given more than once")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.stage)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
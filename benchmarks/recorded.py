@@ -0,0 +1,65 @@
+import argparse
+import re
+from pathlib import Path
+from scripts import config
+from scripts.cassette import Cassette
+
+"""
+Writes the league, team and results pages recorded in the HTTP cassette to
+benchmarks/pages/recorded, so the pre-scan is benchmarked and tested on pages of
+the site and not only on the pages written by benchmarks.fixtures.
+
+Record the pages first with the URLs of the site in the environment, e.g.
+HTTP_MODE=record python batch.py fixtures.csv, then run:
+
+python -m benchmarks.recorded
+
+The page kind is found from LEAGUE_URL, TEAM_URL and RESULTS_URL, so run with the
+same environment as when recording.
+"""
+
+recorded = Path(__file__).parent / 'pages' / 'recorded'
+
+kinds = ['league', 'team', 'results']
+
+
+def kind_urls() -> dict:
+    """Returns dict with page kind as key and the URL its slugs are appended to as value, for the URLs configured."""
+    urls = {'league': config.LEAGUE_URL, 'team': config.TEAM_URL, 'results': config.RESULTS_URL}
+    return {kind: url for kind, url in urls.items() if url}
+
+
+def save_recorded_pages(cassette: Cassette) -> dict:
+    """Writes every page recorded with status 200 to recorded/<kind>/<slug>.html, returns the number written per kind."""
+    written = dict.fromkeys(kinds, 0)
+
+    for url, response in cassette.responses.items():
+        if response['status'] != 200:
+            continue
+
+        for kind, prefix in kind_urls().items():
+            if url.startswith(prefix):
+                slug = re.sub(r'[^\w.-]', '_', url[len(prefix):]) or 'index'
+
+                directory = recorded / kind
+                directory.mkdir(parents=True, exist_ok=True)
+                (directory / f"{slug}.html").write_text(response['body'], encoding='utf-8')
+
+                written[kind] += 1
+                break
+
+    return written
+
+
+def recorded_pages(kind: str) -> list[Path]:
+    """Returns the recorded pages of kind, empty if none were written."""
+    return sorted((recorded / kind).glob('*.html'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes the pages recorded in the HTTP cassette to benchmarks/pages/recorded.")
+    parser.add_argument('cassette', nargs='?', default=config.HTTP_CASSETTE, help=f"cassette to read (default: {config.HTTP_CASSETTE})")
+    args = parser.parse_args()
+
+    for kind, count in save_recorded_pages(Cassette(args.cassette)).items():
+        print(f"{kind:<8} {count:4d} pages")
@@ -0,0 +1,105 @@
+from datetime import datetime
+from timeit import timeit
+from selectolax.parser import HTMLParser
+from scripts.parsing import parse_scraped_scoreboard, parse_last_five_games, parse_coach, parse_match_dates, parse_results
+from scripts.regions import extract_regions, league_regions, team_regions, results_regions
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot
+from .pipeline import read_page
+from .recorded import recorded_pages
+
+"""
+Compares parsing whole pages with parsing only the regions found by the pre-scan.
+
+Uses the pages in benchmarks/pages, written by benchmarks.fixtures, and the pages
+of the site in benchmarks/pages/recorded if written by benchmarks.recorded. The
+numbers of the written pages depend on the filler they were written with, only
+the recorded pages show what the pre-scan saves on the site. selectolax allocates the tree outside the Python
+heap, so memory is shown as the characters handed to the parser and the number of
+nodes in the tree, which the parser memory grows with.
+
+Run with: python -m benchmarks.regions
+"""
+
+
+def full_league(response_text: str) -> tuple:
+    """Previous LeagueSnapshot.from_html(), parsing the whole page."""
+    html = HTMLParser(response_text)
+    table_divs = html.css("div.table-body.table-custom.competition-result")
+
+    return (parse_scraped_scoreboard(table_divs[0]), parse_scraped_scoreboard(table_divs[1]),
+            parse_scraped_scoreboard(table_divs[2]), parse_last_five_games(html.css_first("table.table")))
+
+
+def full_team(response_text: str) -> tuple:
+    """Previous TeamSnapshot.from_html(), parsing the whole page."""
+    html = HTMLParser(response_text)
+    date_divs = html.css_first('div.spree-content').css('div.date.color-grey2')
+
+    return parse_coach(html.css_first('div#mod_coachStats')), parse_match_dates(date_divs, datetime.today().date())
+
+
+def full_results(response_text: str) -> list:
+    """ResultsSnapshot.from_html() parsing the whole page."""
+    return parse_results(HTMLParser(response_text).css_first('table.table-results'))
+
+
+def nodes(html: HTMLParser) -> int:
+    return sum(1 for _ in html.root.traverse())
+
+
+def report(name: str, response_text: str, regions: list, full, snapshot, same, number: int) -> None:
+    fragments = extract_regions(response_text, regions)
+
+    assert same(full(response_text), snapshot(response_text)), f"{name}: regions parse to other values than the full page"
+
+    if fragments is None:
+        print(f"{name}\n  regions not found, parsed in full")
+        return
+
+    full_tree, region_tree = HTMLParser(response_text), HTMLParser(fragments)
+
+    full_ms = 1000 * timeit(lambda: full(response_text), number=number) / number
+    region_ms = 1000 * timeit(lambda: snapshot(response_text), number=number) / number
+    scan_ms = 1000 * timeit(lambda: extract_regions(response_text, regions), number=number) / number
+    full_tree_ms = 1000 * timeit(lambda: HTMLParser(response_text), number=number) / number
+    region_tree_ms = 1000 * timeit(lambda: HTMLParser(extract_regions(response_text, regions)), number=number) / number
+
+    print(f"{name}")
+    print(f"  parse time:  {full_ms:7.2f} ms full page -> {region_ms:7.2f} ms regions, of which {scan_ms:.2f} ms pre-scan ({full_ms / region_ms:.1f}x)")
+    print(f"  tree only:   {full_tree_ms:7.2f} ms full page -> {region_tree_ms:7.2f} ms regions ({full_tree_ms / region_tree_ms:.1f}x)")
+    print(f"  parsed text: {len(response_text):7d} chars    -> {len(fragments):7d} chars")
+    print(f"  tree nodes:  {nodes(full_tree):7d}          -> {nodes(region_tree):7d}")
+
+
+def same_league(full: tuple, snapshot: LeagueSnapshot) -> bool:
+    tables = (snapshot.total_table, snapshot.home_table, snapshot.away_table)
+    return all(a.equals(b) for a, b in zip(full[:3], tables)) and full[3] == snapshot.last_five_games
+
+
+def same_team(full: tuple, snapshot: TeamSnapshot) -> bool:
+    return full == (snapshot.coach, snapshot.match_dates)
+
+
+def same_results(full: list, snapshot: ResultsSnapshot) -> bool:
+    return full == snapshot.results
+
+
+if __name__ == "__main__":
+    for page in ('premier-league.html', 'championship.html'):
+        report(f"League page {page}", read_page(page), league_regions, full_league, LeagueSnapshot.from_html, same_league, 100)
+
+    report("Team page team.html", read_page('team.html'), team_regions, full_team, TeamSnapshot.from_html, same_team, 100)
+    report("Results page results.html", read_page('results.html'), results_regions, full_results, ResultsSnapshot.from_html, same_results, 100)
+
+    pages = {
+        'league': (league_regions, full_league, LeagueSnapshot.from_html, same_league),
+        'team': (team_regions, full_team, TeamSnapshot.from_html, same_team),
+        'results': (results_regions, full_results, ResultsSnapshot.from_html, same_results),
+    }
+
+    for kind, (regions, full, snapshot, same) in pages.items():
+        for path in recorded_pages(kind):
+            report(f"Recorded {kind} page {path.name}", path.read_text(encoding='utf-8'), regions, full, snapshot, same, 20)
+
+    if not any(recorded_pages(kind) for kind in pages):
+        print("No recorded pages, see benchmarks/recorded.py")
@@ -0,0 +1,34 @@
+from timeit import timeit
+from scripts.scraping import scrape_total_table, scrape_home_table, scrape_away_table, scrape_last_five_games, scrape_coach, scrape_match_dates
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot
+from .fixtures import league_page, team_page
+
+"""
+Compares parsing a page once per scraper with parsing it once into a snapshot.
+
+Run with: python -m benchmarks.snapshot
+"""
+
+
+def scrape_league_per_function(response_text: str) -> None:
+    scrape_total_table(response_text)
+    scrape_home_table(response_text)
+    scrape_away_table(response_text)
+    scrape_last_five_games(response_text)
+
+
+def scrape_team_per_function(response_text: str) -> None:
+    scrape_coach(response_text)
+    scrape_match_dates(response_text)
+
+
+def report(name: str, before, after, response_text: str, number: int) -> None:
+    before_ms = 1000 * timeit(lambda: before(response_text), number=number) / number
+    after_ms = 1000 * timeit(lambda: after(response_text), number=number) / number
+
+    print(f"{name}: {before_ms:.2f} ms per scraper -> {after_ms:.2f} ms snapshot ({before_ms / after_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    report("League page", scrape_league_per_function, LeagueSnapshot.from_html, league_page(), 50)
+    report("Team page", scrape_team_per_function, TeamSnapshot.from_html, team_page(), 50)
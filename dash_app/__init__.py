@@ -1,4 +1,25 @@
+import multiprocessing
+import threading
 from .main import app
+from scripts import config
+
+def preload():
+    """Imports the scraping stack, fills the cache from the snapshot store and starts the warm-up."""
+    from scripts.scraping import load_persisted_snapshots
+    from scripts.warmup import start_warmup
+
+    # Start warm from the snapshots stored before the last restart
+    load_persisted_snapshots()
+
+    # Pre-scrape all leagues and teams in the background
+    start_warmup()
 
 def create_app():
-    return app
\ No newline at end of file
+    # pandas and the scraping stack are loaded in the background, so pages are served
+    # right away and the first callback finds them imported.
+    # Processes spawned by the warm-up parse pool import run.py again, they only parse
+    # and must not read the snapshot store or start a warm-up of their own
+    if config.PRELOAD_ENABLED and multiprocessing.parent_process() is None:
+        threading.Thread(target=preload, name='preload', daemon=True).start()
+
+    return app
@@ -0,0 +1,26 @@
+// Pure UI callbacks, run in the browser so they cost no server requests.
+// Registered with ClientsideFunction('matches', <name>) in main.py.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    matches: {
+        // Hides the match container when its remove button is pressed.
+        remove_match: function(_) {
+            return {display: 'none'};
+        },
+
+        // Numbers the titles of the matches not removed, removed matches get an empty title.
+        update_titles: function(_, styles) {
+            let matchIndex = 1;
+            return styles.map(style => style ? '' : `Match ${matchIndex++}`);
+        },
+
+        // Points the export links to the export route with the matches not removed.
+        update_export_links: function(sessionId, displayStyles, containerIds, linkIds) {
+            const visible = containerIds
+                .filter((containerId, i) => !displayStyles[i])
+                .map(containerId => containerId.index)
+                .join(',');
+
+            return linkIds.map(linkId => `/export/${linkId.format}?session=${sessionId}&matches=${visible}`);
+        },
+    },
+});
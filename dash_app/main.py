@@ -1,129 +1,146 @@
-from dash import Dash, dcc, Output, Input, State, html, no_update, dash_table, MATCH, ALL, ctx
+from dash import Dash, dcc, Output, Input, State, html, no_update, dash_table, MATCH, ALL, ctx, ClientsideFunction, Patch
 from dash.exceptions import PreventUpdate
-from scripts.scraping import scrape_last_five_games, fetch_team_html, scrape_games_last_week, scrape_coach, fetch_league_html, scrape_total_table, scrape_home_table, scrape_away_table
-from .utils.helpers import format_data_to_table, format_conditional_styling, table_style_to_cell_map
+from .utils.instrumentation import instrument_payloads, add_metrics_route
+from scripts.metrics import callback_seconds, timed
 from .utils.info import table_cols, leagues
+from flask import Response, request, stream_with_context
 import dash_bootstrap_components as dbc   
-import pandas as pd
-import xlsxwriter
-from io import BytesIO
+import uuid
+
+# The scraping stack and the helpers, state and export modules pull in pandas, selectolax
+# and xlsxwriter, so they are imported in the callbacks and routes using them. The page
+# can then be served before they are loaded, see preload() in dash_app/__init__.py
 
 
 # App
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], prevent_initial_callbacks='initial_duplicate')
+instrument_payloads(app.server)
+add_metrics_route(app.server)
 
 # Components
 # Layout
-app.layout = html.Div(
-    [
-        dcc.Store(
-            id='scoreboard-store',
-            data={
-                'total scoreboard': {},
-                'home scoreboard': {},
-                'away scoreboard': {},
-                'last five games': {},
-            },
-        ),
-        dcc.Store(
-            id='team-data-store',
-            data = {
-                'coach': {},
-                'games last week': {},
-            }
-        ),
-        dcc.Download('download-component'),        
-        html.Div(id='hidden-div', style={'display': 'none'}),
-        dbc.Button(
-            "Lägg till lag", id="add-team-button", className="me-2 mb-3", n_clicks=0
-        ),
-        dbc.Button(
-            "Spara", id="save-matches-button", className="me-3 mb-3", n_clicks=0
-        ),
-        html.Div(
-            children=[],
-            id='component-container'
-        ),
-    ], className='m-3', id ='main-container',
-)
+def serve_layout():
+    """Layout is served per page load, so every browser session gets its own session id."""
+    return html.Div(
+        [
+            # Key of the comparison tables of this session on the server, see utils/state.py
+            dcc.Store(
+                id='session-id',
+                data=uuid.uuid4().hex,
+            ),
+            html.Div(id='hidden-div', style={'display': 'none'}),
+            dbc.Button(
+                "Lägg till lag", id="add-team-button", className="me-2 mb-3", n_clicks=0
+            ),
+            dbc.DropdownMenu(
+                [
+                    dbc.DropdownMenuItem("Excel", id={'type': 'export-link', 'format': 'xlsx'}, href='', external_link=True),
+                    dbc.DropdownMenuItem("CSV", id={'type': 'export-link', 'format': 'csv'}, href='', external_link=True),
+                    dbc.DropdownMenuItem("Parquet", id={'type': 'export-link', 'format': 'parquet'}, href='', external_link=True),
+                ], label="Spara", id="save-matches-menu", className="me-3 mb-3 d-inline-block",
+            ),
+            html.Div(
+                children=[],
+                id='component-container'
+            ),
+        ], className='m-3', id ='main-container',
+    )
+
+
+app.layout = serve_layout
+
+
+# Routes
+@app.server.route('/export/<export_format>')
+def export_matches(export_format):
+    """
+    Streams the visible matches of a session as xlsx, csv or parquet.
 
+    Query parameters are session, the session id, and matches, the comma separated
+    indices of the visible matches in order.
 
-# Callbacks   
-@app.callback(Output('download-component', 'data'),
-              Input('save-matches-button', 'n_clicks'),
-              State({'type': 'table', 'index': ALL}, 'data'),
-              State({'type': 'table', 'index': ALL}, 'style_data_conditional'),
-              State({'type': 'match-container', 'index': ALL}, 'style'),
-              prevent_initial_call=True)
-def save_excel_new(n_clicks, data, data_styles, display_styles):
-    """
-    Saves the content of all tables with data as a formatted excel doc.
+    The Spara items link here, so if there is nothing to export 204 No Content is
+    returned and the browser stays on the page with its matches.
     """
+    from .utils.export import export_formats
+    from .utils.state import get_matches
 
-    if n_clicks and data != [] and not all(isinstance(e, dict) for e in display_styles):
-        # Convert data from tables to dataframes
-        # To fix a certain bug, set to None otherwise
-        dfs = [pd.DataFrame(d) if d != None else None for d in data]
+    if export_format not in export_formats:
+        return Response(status=204)
 
-        styles = table_style_to_cell_map(data_styles)
+    indices = [int(index) for index in request.args.get('matches', '').split(',') if index.isdigit()]
+    matches = get_matches(request.args.get('session', ''), indices)
 
-        output = BytesIO()
+    if matches == []:
+        return Response(status=204)
 
-        writer = pd.ExcelWriter(output, engine='xlsxwriter')
+    chunks, mimetype = export_formats[export_format]
 
-        workbook = None
-        worksheet = None
+    try:
+        body = chunks(matches)
 
-        non_empty_df_number = 0
+    except ImportError as e:
+        # Parquet needs pyarrow
+        print(f"Error exporting {export_format}: {e}")
+        return Response(status=204)
 
-        for df_number, df in enumerate(dfs):
-            # Checks that data is present and that it is not a deleted match
-            if isinstance(df, pd.DataFrame) and display_styles[df_number] == None:
-                df.to_excel(writer, sheet_name="Sheet1", index=False, header=True, startrow = 1 + 5 * non_empty_df_number)
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=matcher.{export_format}'},
+    )
 
-                # Access the workbook and worksheet objects
-                workbook = writer.book
-                worksheet = writer.sheets["Sheet1"]
 
-                bold = workbook.add_format({'bold': True})
-                worksheet.write(non_empty_df_number * 5, 0, f"Match {non_empty_df_number + 1}", bold)
+# Callbacks   
+# Pure UI callbacks run in the browser, see assets/clientside.js
+app.clientside_callback(ClientsideFunction('matches', 'update_export_links'),
+                        Output({'type': 'export-link', 'format': ALL}, 'href'),
+                        Input('session-id', 'data'),
+                        Input({'type': 'match-container', 'index': ALL}, 'style'),
+                        State({'type': 'match-container', 'index': ALL}, 'id'),
+                        State({'type': 'export-link', 'format': ALL}, 'id'))
 
-                # Apply styles to cells
-                # We need to rewrite the pandas data because xlsxwriter can't style cells without writing data
-                values = df.values
-                for row in range(values.shape[0]):
-                    for col in range(values.shape[1]):
-                        color = workbook.add_format()
-                        color.set_bg_color(styles[non_empty_df_number, row, col])
-                        # When writing, row must be incremented by two due to Match label and column headers
-                        worksheet.write(row + 2 + 5 * non_empty_df_number, col, values[row, col], color)
 
-                non_empty_df_number += 1
+app.clientside_callback(ClientsideFunction('matches', 'remove_match'),
+                        Output({'type': 'match-container', 'index': MATCH}, 'style'),
+                        Input({'type': 'remove-button', 'index': MATCH}, 'n_clicks'),
+                        prevent_initial_call=True)
+
+
+# Fix titles when we press add or remove match
+app.clientside_callback(ClientsideFunction('matches', 'update_titles'),
+                        Output({'type': 'match-title', 'index': ALL}, 'children'),
+                        Input('add-team-button', 'n_clicks'),
+                        Input({'type': 'match-container', 'index': ALL}, 'style'),
+                        prevent_initial_call=False)
+
+
+@app.callback(Output({'type': 'table-sync', 'index': MATCH}, 'data'),
+              Input({'type': 'table', 'index': MATCH}, 'data_timestamp'),
+              State({'type': 'table', 'index': MATCH}, 'data'),
+              State('session-id', 'data'),
+              prevent_initial_call=True)
+@timed(callback_seconds)
+def sync_table_edits(_, data, session_id):
+    """
+    Copies cells edited by the user to the server-side tables used for export.
+    """
+    from .utils.state import save_table
+
+    save_table(session_id, ctx.triggered_id['index'], data)
+
+    return no_update
 
-        # In the case where we have a removed dataset + an empty dataset
-        if worksheet != None:
-            # This makes sure the columns expand to fit the text
-            worksheet.autofit()
-            
-            # Writer needs to be closed first
-            writer.close()
-            output.seek(0)  # Move the pointer to the start of the BytesIO object
-            return dcc.send_bytes(output.read(), filename="matcher.xlsx")
-        
-        else:
-            return no_update
-        
-    else:
-        return no_update
-        
 
 @app.callback(Output('component-container', 'children'),
               Input('add-team-button', 'n_clicks'),
-              State('component-container', 'children'),
               prevent_initial_call=True)
-def add_team(n_clicks, children):
+@timed(callback_seconds)
+def add_team(n_clicks):
     """
     Adds new team component to layout dynamically when button is pressed.
+
+    Only the new component is sent, it is appended to the existing children with a Patch.
     """
     
     if n_clicks > 0:
@@ -136,6 +153,11 @@ def add_team(n_clicks, children):
         away_team_dropdown = dcc.Dropdown(options=[''], value='', 
                                           id={'type': 'away-dropdown', 'index': n_clicks})
 
+        # Empty for the current tables, else the tables as archived on the date
+        # Enabled once a league with archived tables is picked
+        as_of_date_picker = dcc.DatePickerSingle(date=None, clearable=True, display_format='YYYY-MM-DD', disabled=True,
+                                                 placeholder='Idag', id={'type': 'as-of-date', 'index': n_clicks})
+
         table = dash_table.DataTable(
             data = None,
             columns = [{'name': i, 'id': i, 'editable': True if i == 'Saknade nyckelspelare' or i == 'Head to head senaste 3 ggr' or i == 'Övriga kommentarer' else False} for i in table_cols],
@@ -186,16 +208,30 @@ def add_team(n_clicks, children):
                                 ])
                             ])
                         ), 
+                        dbc.Col(
+                            dbc.Card([
+                                dbc.CardBody([
+                                    html.H4("Per datum", className="card-title"),
+                                    as_of_date_picker,
+                                ])
+                            ])
+                        ), 
                     ], className='mb-3'
                 ),
                 dbc.Row(
                     [
                         table,
                     ], className='mb-3',
-                )
+                ),
+                # Id of the snapshot of the selected league
+                # The snapshot itself stays on the server, see resolve_league_snapshot()
+                dcc.Store(id={'type': 'league-snapshot', 'index': n_clicks}),
+                # Output of sync_table_edits, which needs an output matching the table
+                dcc.Store(id={'type': 'table-sync', 'index': n_clicks}),
             ], id={'type': 'match-container', 'index': n_clicks}, 
         )
 
+        children = Patch()
         children.append(container)
 
         return children
@@ -204,38 +240,12 @@ def add_team(n_clicks, children):
         return no_update
     
 
-@app.callback(Output({'type': 'match-container', 'index': MATCH}, 'style'),
-              Input({'type': 'remove-button', 'index': MATCH}, 'n_clicks'),
-              prevent_initial_call=True)
-def remove_match(_):
-    return {"display": "none"}
-
-
-@app.callback(Output({'type': 'match-title', 'index': ALL}, 'children'),
-              Input('add-team-button', 'n_clicks'),
-              Input({'type': 'match-container', 'index': ALL}, 'style'),
-              prevent_initial_call=False)
-def update_titles(_, styles):
-    """
-    Fix titles when we press add or remove match.
-    """
-    print("Clicked!")
-    print(styles)
-    new_titles = [''] * len(styles)
-    match_index = 1
-    for i in range(len(styles)):
-        if styles[i] == None:
-            new_titles[i] = f"Match {match_index}"
-            match_index += 1
-
-    return new_titles
-
-
 # Problem: all outputs must be of MATCH index! So can't update data since it is not a match
 @app.callback(Output({'type': 'home-dropdown', 'index': MATCH}, 'options'),
             Output({'type': 'away-dropdown', 'index': MATCH}, 'options'),
             Input({'type': 'league-dropdown', 'index': MATCH}, 'value'),
             prevent_initial_call=True)
+@timed(callback_seconds)
 def update_league_dropdown(league):
     """
     Populates the home and away dropdowns.
@@ -250,123 +260,150 @@ def update_league_dropdown(league):
         raise PreventUpdate
     
 
-@app.callback(Output('scoreboard-store', 'data'),
-              Input({'type': 'league-dropdown', 'index': ALL}, 'value'),
-              State('scoreboard-store', 'data'),
+@app.callback(Output({'type': 'as-of-date', 'index': MATCH}, 'min_date_allowed'),
+              Output({'type': 'as-of-date', 'index': MATCH}, 'max_date_allowed'),
+              Output({'type': 'as-of-date', 'index': MATCH}, 'disabled'),
+              Output({'type': 'as-of-date', 'index': MATCH}, 'date'),
+              Input({'type': 'league-dropdown', 'index': MATCH}, 'value'),
               prevent_initial_call=True)
-def update_scoreboards(league, data):
+@timed(callback_seconds)
+def update_as_of_range(league):
     """
-    Updates scoreboard when any league dropdown changes.
+    Limits the as of date picker to the dates with archived tables of the league.
+
+    The picker is disabled and cleared if the league has no archived tables.
     """
-    if league != [''] and league is not None:
-        # Due to the Input: ALL from dropdowns, leage will be a list, so we need to access correct idx
-        triggered = ctx.triggered_id['index']
-        league = league[triggered - 1]
-
-        if league != '':
-
-            # Check if scoreboards not already populated
-            # If not, call functions to scrape data
-            # Note that dataframes need to be JSON serializable
-            if league not in data['total scoreboard'].keys():
-                # All scrape methods here use the same response_text object as parameter
-                # Getting it once is enough
-                response_text = fetch_league_html(league)
-                total_table = scrape_total_table(response_text)
-                data['total scoreboard'][league] = total_table.to_json(date_format='iso', orient='split')
-
-            if league not in data['home scoreboard'].keys():
-                home_table = scrape_home_table(response_text)
-                data['home scoreboard'][league] = home_table.to_json(date_format='iso', orient='split')
-
-            if league not in data['away scoreboard'].keys():
-                away_table = scrape_away_table(response_text)
-                data['away scoreboard'][league] = away_table.to_json(date_format='iso', orient='split')
-
-            if league not in data['last five games'].keys():
-                last_five_games = scrape_last_five_games(response_text)
-                data['last five games'][league] = last_five_games
-
-            return data
-        
-        return no_update
+    from scripts.scraping import archived_dates
+
+    if league != '' and league is not None:
+        dates = archived_dates(league)
+
+        # Nothing archived yet, only the current tables can be shown
+        if dates == []:
+            return None, None, True, None
+
+        return dates[0].isoformat(), dates[-1].isoformat(), False, no_update
+
+    else:
+        raise PreventUpdate
+
+
+@app.callback(Output({'type': 'league-snapshot', 'index': MATCH}, 'data'),
+              Input({'type': 'league-dropdown', 'index': MATCH}, 'value'),
+              prevent_initial_call=True)
+@timed(callback_seconds)
+def update_scoreboards(league):
+    """
+    Updates the league snapshot of the match when its league dropdown changes.
+    """
+    from scripts.scraping import get_league_data
+
+    if league != '' and league is not None:
+        # Get snapshot from the shared cache, which scrapes on a miss
+        # Only the snapshot id is sent to the browser
+        return get_league_data(league).id
     
     else:
         return no_update
 
 
-@app.callback(Output({'type': 'table', 'index': ALL}, 'data'),
-              Output({'type': 'table', 'index': ALL}, 'style_data_conditional'),
-              Output('team-data-store', 'data'),
-              Input({'type': 'home-dropdown', 'index': ALL}, 'value'),
-              Input({'type': 'away-dropdown', 'index': ALL}, 'value'),
-              State({'type': 'league-dropdown', 'index': ALL}, 'value'),
-              State({'type': 'table', 'index': ALL}, 'data'),
-              State({'type': 'table', 'index': ALL}, 'style_data_conditional'),
-              State('team-data-store', 'data'),
-              State('scoreboard-store', 'data'),
+@app.callback(Output({'type': 'table', 'index': MATCH}, 'data'),
+              Output({'type': 'table', 'index': MATCH}, 'style_data_conditional'),
+              Input({'type': 'home-dropdown', 'index': MATCH}, 'value'),
+              Input({'type': 'away-dropdown', 'index': MATCH}, 'value'),
+              Input({'type': 'as-of-date', 'index': MATCH}, 'date'),
+              State({'type': 'league-dropdown', 'index': MATCH}, 'value'),
+              State({'type': 'league-snapshot', 'index': MATCH}, 'data'),
+              State('session-id', 'data'),
               prevent_initial_call=True)
-def on_team_change(home_team, away_team, league, table_data, style_data_conditional, team_data, scoreboard):
+@timed(callback_seconds)
+def on_team_change(home_team, away_team, as_of, league, snapshot_id, session_id):
     """
-    Updates the table data using data from team-data-store and scoreboard-store.
+    Updates the table data using team data from the shared cache and the league snapshot of the match.
+
+    If an as of date is picked, the scoreboards and form are read from the snapshot
+    archive as they were on that date, and games last week and head to head are
+    counted up to it. Nothing is fetched for a past date, team data and results
+    come from the cache only. Games last week are left empty for a team whose
+    team page does not reach back to the week before the date.
+    If nothing is archived on or before the date, the table only says so, the
+    current tables are never shown for a past date.
 
-    If home_team or away_team has no data in team-data-store, it is fetched first.
+    Otherwise, if home_team or away_team has no data in the cache, it is fetched first.
+
+    Only the table of the match where a team changed is sent and returned.
 
     Data formatting done with format_data_to_table function in utils/helpers.
     """
-    # We need to determine which ID changed.
-    # We have to do it this way to be able to u - 1pdate a specific table and the data store in the same callback
-    triggered_id = ctx.triggered_id['index']
-    home_team = home_team[triggered_id - 1]
-    away_team = away_team[triggered_id - 1]
-    league = league[triggered_id - 1]
+    from datetime import date
+    from scripts.scraping import (get_teams_data, get_cached_teams_data, get_congestion_index, get_head_to_head_index,
+                                  get_head_to_head_index_as_of, get_league_data_as_of, resolve_league_snapshot)
+    from .utils.helpers import format_data_to_table, format_conditional_styling
+    from .utils.state import save_table
 
     # Check that teams are properly selected
-    if home_team != '' and away_team != '' and league != '':
+    if home_team and away_team and league:
 
-        if home_team not in team_data['coach'].keys():
-            # Get home team coach for home team
-            home_team_html = fetch_team_html(home_team)
-            team_data['coach'][home_team] = scrape_coach(home_team_html)
+        # Get scoreboard data and last five games from the archive if a past date is picked
+        if as_of:
+            today = date.fromisoformat(as_of)
+            snapshot = get_league_data_as_of(league, today)
 
-        if away_team not in team_data['coach'].keys():
-            # Get away team coach for away team
-            away_team_html = fetch_team_html(away_team)
-            team_data['coach'][away_team] = scrape_coach(away_team_html)
+            if snapshot is None:
+                table_data = [{table_cols[0]: f"Ingen arkiverad tabell för {league} per {as_of}"}]
 
-        if home_team not in team_data['games last week'].keys():
-            # Get last weeks games for home tea
-            team_data['games last week'][home_team] = scrape_games_last_week(home_team_html)
+                # Nothing to export for the match
+                save_table(session_id, ctx.triggered_id['index'], [], [])
 
-        if away_team not in team_data['games last week'].keys():
-            # Get last weeks games for away team
-            team_data['games last week'][away_team] = scrape_games_last_week(away_team_html)  
+                return table_data, []
 
-        # Get scoreboard data and last five games
-        # Note that dfs need to be read as JSON
-        total_score = pd.read_json(scoreboard['total scoreboard'][league], orient='split')
-        home_score = pd.read_json(scoreboard['home scoreboard'][league], orient='split')
-        away_score = pd.read_json(scoreboard['away scoreboard'][league], orient='split')
-        last_five_games = scoreboard['last five games'][league]
+            # Team data and meetings up to the date from the cache, never scraped for a past date
+            teams_data = get_cached_teams_data([home_team, away_team])
+            head_to_head = get_head_to_head_index_as_of(league, today)
+
+        # Else from the snapshot of the match
+        else:
+            today = date.today()
+            snapshot = resolve_league_snapshot(league, snapshot_id)
+
+            # Get team data, scraped only if not already cached
+            # Home and away team pages are fetched concurrently
+            teams_data = get_teams_data([home_team, away_team])
+
+            # Last meetings of the teams from the head-to-head index of the league
+            head_to_head = get_head_to_head_index(league, [home_team, away_team])
+
+        home_team_data = teams_data[home_team]
+        away_team_data = teams_data[away_team]
+
+        total_score = snapshot.total_table
+        home_score = snapshot.home_table
+        away_score = snapshot.away_table
+        last_five_games = snapshot.last_five_games
 
         # Get team data
-        coach_home = team_data['coach'][home_team]
-        coach_away = team_data['coach'][away_team]
-        home_games_last_week = team_data['games last week'][home_team]
-        away_games_last_week = team_data['games last week'][away_team]
+        coach_home = home_team_data['coach']
+        coach_away = away_team_data['coach']
+
+        # Games and days of rest of both teams from the congestion index of the league
+        congestion = get_congestion_index(league, [home_team, away_team])
+
+        # The team pages list their latest matches, so a past week may be cut off
+        if as_of:
+            congestion = congestion.covering(7, today)
 
         # Update table data
-        df = format_data_to_table(home_team, away_team, total_score, home_score, away_score, last_five_games, coach_home, coach_away, home_games_last_week, away_games_last_week)
+        df = format_data_to_table(home_team, away_team, total_score, home_score, away_score, last_five_games, coach_home, coach_away, head_to_head, congestion, today)
 
-        table_data[triggered_id - 1] = df.to_dict('records')
+        table_data = df.to_dict('records')
 
         # Update conditional styling
-        conditional_style = format_conditional_styling(home_team, away_team, total_score, home_score, away_score, last_five_games, coach_home, coach_away, home_games_last_week, away_games_last_week)
+        conditional_style = format_conditional_styling(home_team, away_team, total_score, home_score, away_score, last_five_games, coach_home, coach_away, head_to_head, congestion, today)
 
-        # Give styling to the correct table
-        style_data_conditional[triggered_id - 1] = conditional_style
+        # Keep a copy on the server for export
+        save_table(session_id, ctx.triggered_id['index'], table_data, conditional_style)
         
-        return table_data, style_data_conditional, team_data
+        return table_data, conditional_style
 
     else:
-        raise PreventUpdate
\ No newline at end of file
+        raise PreventUpdate
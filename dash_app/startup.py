@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+"""
+Report of the time spent importing modules when the app starts.
+
+Runs the start in a new interpreter with python -X importtime, so the modules
+already imported by this process do not hide their cost. Imports are split in
+the boot, done before the first page can be served, and the modules deferred to
+the first callback, see the note at the top of dash_app/main.py.
+"""
+
+# Modules imported by the callbacks and routes when first used
+deferred_modules = ['scripts.scraping', 'scripts.warmup', 'dash_app.utils.helpers', 'dash_app.utils.state', 'dash_app.utils.export', 'xlsxwriter']
+
+# Rows of packages and modules shown per phase
+top = 10
+
+
+def parse_importtime(output: str) -> list[tuple[str, int, int, int]]:
+    """Returns (module, self microseconds, cumulative microseconds, depth) per import in -X importtime output."""
+    imports = []
+
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    return imports
+
+
+def measure_imports() -> tuple[list, list]:
+    """Returns the imports of the boot and of the deferred modules, from a fresh interpreter."""
+    code = 'import run\n' + ''.join(f'import {module}\n' for module in deferred_modules)
+
+    # Nothing is loaded in the background, so every import is done by the main thread in order
+    env = {**os.environ, 'PRELOAD_ENABLED': '0', 'WARMUP_ENABLED': '0'}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, env=env,
+                            capture_output=True, text=True, check=True)
+    imports = parse_importtime(result.stderr)
+
+    # The line of run itself ends the boot, as an import is logged when it is done
+    boot_end = next(i for i, (name, _, _, depth) in enumerate(imports) if name == 'run' and depth == 0) + 1
+
+    return imports[:boot_end], imports[boot_end:]
+
+
+def format_phase(title: str, imports: list) -> list[str]:
+    total = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in imports:
+        packages[name.split('.')[0]] += self_us
+
+    lines = [f"{title:<40} {total / 1e6:7.3f} s", "  packages:"]
+    lines += [f"    {name:<36} {us / 1e6:7.3f} s" for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]]
+    lines.append("  modules (self time):")
+    lines += [f"    {name:<36} {us / 1e6:7.3f} s" for name, us, _, _ in sorted(imports, key=lambda item: -item[1])[:top]]
+
+    return lines
+
+
+def startup_report() -> str:
+    """Returns the import times of the boot and of the modules deferred to the first callback."""
+    boot, deferred = measure_imports()
+
+    return '\n'.join(
+        format_phase("Boot (import run)", boot)
+        + ['']
+        + format_phase("Deferred to first callback", deferred)
+    )
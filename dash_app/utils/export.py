@@ -0,0 +1,178 @@
+import csv
+import os
+import tempfile
+import pandas as pd
+from io import BytesIO, StringIO
+
+# Background of cells without conditional styling
+default_color = '#FFFFFF'
+
+# Rows used by each match: label, column headers, home team, away team and an empty row
+rows_per_match = 5
+
+# Bytes per chunk when streaming exports
+chunk_size = 64 * 1024
+
+# Same look as the headers written by pandas to_excel
+header_format = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+
+def style_to_colors(style: list, columns: list[str], n_rows: int) -> list[list[str]]:
+    """
+    Turns style_data_conditional of one table to a grid of background colors.
+
+    Returns list with one list of colors per row, default_color where no style applies.
+    """
+    col_index = {column: i for i, column in enumerate(columns)}
+    colors = [[default_color] * len(columns) for _ in range(n_rows)]
+
+    for dct in style or []:
+        colors[dct['if']['row_index']][col_index[dct['if']['column_id']]] = dct['backgroundColor']
+
+    return colors
+
+
+def matches_to_excel(matches: list[tuple[pd.DataFrame, list]], constant_memory: bool = False) -> bytes:
+    """
+    Returns matches as a formatted excel doc, see write_matches_excel().
+    """
+    output = BytesIO()
+    write_matches_excel(matches, output, constant_memory)
+
+    return output.getvalue()
+
+
+def write_matches_excel(matches: list[tuple[pd.DataFrame, list]], output, constant_memory: bool = False) -> None:
+    """
+    Writes matches as a formatted excel doc to output, a file path or a file object.
+
+    matches is a list of (table data, style_data_conditional) pairs, one per match.
+    Each match gets a "Match n" label, the table and the background colors of the table.
+
+    Every cell is written once, with one shared format per distinct color. With
+    constant_memory, xlsxwriter flushes each row to disk once written instead of
+    keeping the whole sheet in memory.
+    """
+    # Only needed for excel exports
+    import xlsxwriter
+
+    # in_memory would override constant_memory, so temporary files are only used in that mode
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': constant_memory, 'in_memory': not constant_memory})
+    worksheet = workbook.add_worksheet("Sheet1")
+
+    bold = workbook.add_format({'bold': True})
+    header = workbook.add_format(header_format)
+
+    # color -> format, shared by all cells with that background
+    color_formats = {}
+
+    # column -> longest text in column, to fit the column widths
+    widths = {}
+
+    for match_number, (df, style) in enumerate(matches):
+        start_row = rows_per_match * match_number
+        columns = list(df.columns)
+        values = df.values.tolist()
+        colors = style_to_colors(style, columns, len(values))
+
+        worksheet.write(start_row, 0, f"Match {match_number + 1}", bold)
+        worksheet.write_row(start_row + 1, 0, columns, header)
+
+        for row, (row_values, row_colors) in enumerate(zip(values, colors)):
+            for col, (value, color) in enumerate(zip(row_values, row_colors)):
+                if color not in color_formats:
+                    color_formats[color] = workbook.add_format({'bg_color': color})
+
+                # When writing, row must be incremented by two due to Match label and column headers
+                worksheet.write(start_row + 2 + row, col, value, color_formats[color])
+
+        for row_values in [columns] + values:
+            for col, value in enumerate(row_values):
+                widths[col] = max(widths.get(col, 0), len(str(value)))
+
+    # Fit the columns to the text, autofit() is not available in constant memory mode
+    for col, width in widths.items():
+        worksheet.set_column(col, col, width + 1)
+
+    workbook.close()
+
+
+def file_chunks(path: str):
+    """
+    Returns a generator of the content of the file at path in chunks, the file is deleted right away.
+
+    The open file keeps the content until the generator is closed, so nothing is left
+    behind if the response is never read.
+    """
+    # On Windows an open file can not be removed, it is deleted when closed instead
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_TEMPORARY', 0))
+
+    if not hasattr(os, 'O_TEMPORARY'):
+        os.remove(path)
+
+    return read_chunks(os.fdopen(fd, 'rb'))
+
+
+def read_chunks(f):
+    """Yields the content of the open file f in chunks and closes it when done."""
+    with f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def excel_chunks(matches: list[tuple[pd.DataFrame, list]]):
+    """Yields the excel doc of matches in chunks, the workbook is built in a temporary file."""
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+
+    try:
+        write_matches_excel(matches, path, constant_memory=True)
+
+    except Exception:
+        os.remove(path)
+        raise
+
+    return file_chunks(path)
+
+
+def csv_chunks(matches: list[tuple[pd.DataFrame, list]]):
+    """Yields matches as csv, one match at a time, laid out as in the excel doc without colors."""
+    for match_number, (df, _) in enumerate(matches):
+        output = StringIO()
+        writer = csv.writer(output)
+
+        writer.writerow([f"Match {match_number + 1}"])
+        writer.writerow(df.columns)
+        writer.writerows(df.values.tolist())
+        writer.writerow([])
+
+        yield output.getvalue().encode('utf-8')
+
+
+def parquet_chunks(matches: list[tuple[pd.DataFrame, list]]):
+    """
+    Yields matches as one parquet table in chunks, with the match number in column "Match".
+
+    Requires pyarrow.
+    """
+    df = pd.concat([df.assign(Match=match_number + 1) for match_number, (df, _) in enumerate(matches)], ignore_index=True)
+
+    fd, path = tempfile.mkstemp(suffix='.parquet')
+    os.close(fd)
+
+    try:
+        df.to_parquet(path, index=False)
+
+    except Exception:
+        os.remove(path)
+        raise
+
+    return file_chunks(path)
+
+
+# Format -> (chunk generator, mimetype) of the export route
+export_formats = {
+    'xlsx': (excel_chunks, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': (csv_chunks, 'text/csv'),
+    'parquet': (parquet_chunks, 'application/vnd.apache.parquet'),
+}
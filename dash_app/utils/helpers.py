@@ -1,9 +1,14 @@
 import pandas as pd
 import numpy as np
 from .info import table_cols
-from datetime import datetime
+from datetime import date
+from scripts.congestion import CongestionIndex
+from scripts.head_to_head import HeadToHeadIndex
 
-def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFrame, home_score: pd.DataFrame, away_score: pd.DataFrame, last_five_games: dict, coach_home: dict, coach_away: dict, home_games_last_week: list[str], away_games_last_week: list[str]) -> pd.DataFrame:
+# Days counted as a week of rest, also for teams without a game in the index
+max_rest_days = 7
+
+def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFrame, home_score: pd.DataFrame, away_score: pd.DataFrame, last_five_games: dict, coach_home: dict, coach_away: dict, head_to_head: HeadToHeadIndex, congestion: CongestionIndex, today: date) -> pd.DataFrame:
 
     # Debug
     # print('Home team:', home_team)
@@ -14,8 +19,8 @@ def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFra
     # print('Last five games', last_five_games)
     # print('Coach home', coach_home)
     # print('Coach away',coach_away)
-    # print('Home games last week', home_games_last_week)
-    # print('Away games last week', away_games_last_week)
+    # print('Home games last week', congestion.recent_games(home_team, 7, today))
+    # print('Away games last week', congestion.recent_games(away_team, 7, today))
 
     # Format first column
     col_1_home = 'Hemma:' + " " + home_team
@@ -24,18 +29,18 @@ def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFra
     # Format second column
     # Position
     if not total_score.empty:
-        home_position = total_score.loc[total_score['name'] == home_team, 'position'].values[0]
-        away_position = total_score.loc[total_score['name'] == away_team, 'position'].values[0]
+        home_position = total_score.at[home_team, 'position']
+        away_position = total_score.at[away_team, 'position']
 
         # Total points
-        home_total_points = total_score.loc[total_score['name'] == home_team, 'points'].values[0]
-        away_total_points = total_score.loc[total_score['name'] == away_team, 'points'].values[0]
+        home_total_points = total_score.at[home_team, 'points']
+        away_total_points = total_score.at[away_team, 'points']
 
         # Scores
-        home_total_scores_for = total_score.loc[total_score['name'] == home_team, 'scores for'].values[0]
-        home_total_scores_against = total_score.loc[total_score['name'] == home_team, 'scores against'].values[0]
-        away_total_scores_for = total_score.loc[total_score['name'] == away_team, 'scores for'].values[0]
-        away_total_scores_against = total_score.loc[total_score['name'] == away_team, 'scores against'].values[0]
+        home_total_scores_for = total_score.at[home_team, 'scores for']
+        home_total_scores_against = total_score.at[home_team, 'scores against']
+        away_total_scores_for = total_score.at[away_team, 'scores for']
+        away_total_scores_against = total_score.at[away_team, 'scores against']
 
         col_2_home = str(home_position) + ", " + str(home_total_points) + "p, " + str(home_total_scores_for) + ":" + str(home_total_scores_against)
         col_2_away = str(away_position) + ", " + str(away_total_points) + "p, " + str(away_total_scores_for) + ":" + str(away_total_scores_against)
@@ -47,28 +52,28 @@ def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFra
     # Format third column
     # Home team result
     if not home_score.empty and not away_score.empty:
-        home_wins = home_score.loc[home_score['name'] == home_team, 'wins'].values[0]
-        home_draws = home_score.loc[home_score['name'] == home_team, 'draws'].values[0]
-        home_losses = home_score.loc[home_score['name'] == home_team, 'losses'].values[0]
+        home_wins = home_score.at[home_team, 'wins']
+        home_draws = home_score.at[home_team, 'draws']
+        home_losses = home_score.at[home_team, 'losses']
 
         # Away team result
-        away_wins = away_score.loc[away_score['name'] == away_team, 'wins'].values[0]
-        away_draws = away_score.loc[away_score['name'] == away_team, 'draws'].values[0]
-        away_losses = away_score.loc[away_score['name'] == away_team, 'losses'].values[0]
+        away_wins = away_score.at[away_team, 'wins']
+        away_draws = away_score.at[away_team, 'draws']
+        away_losses = away_score.at[away_team, 'losses']
 
         # Home team points
-        home_points = home_score.loc[home_score['name'] == home_team, 'points'].values[0]
+        home_points = home_score.at[home_team, 'points']
 
         # Away team points
-        away_points = away_score.loc[away_score['name'] == away_team, 'points'].values[0]
+        away_points = away_score.at[away_team, 'points']
 
         # Home scores
-        home_scores_for = home_score.loc[home_score['name'] == home_team, 'scores for'].values[0]
-        home_scores_against = home_score.loc[home_score['name'] == home_team, 'scores against'].values[0] 
+        home_scores_for = home_score.at[home_team, 'scores for']
+        home_scores_against = home_score.at[home_team, 'scores against'] 
 
         # Away scores
-        away_scores_for = away_score.loc[away_score['name'] == away_team, 'scores for'].values[0]
-        away_scores_against = away_score.loc[away_score['name'] == away_team, 'scores against'].values[0] 
+        away_scores_for = away_score.at[away_team, 'scores for']
+        away_scores_against = away_score.at[away_team, 'scores against'] 
 
         col_3_home = str(home_wins) + "-" + str(home_draws) + "-" + str(home_losses) + ", " + str(home_points) + "p, " + str(home_scores_for) + ":" + str(home_scores_against)
         col_3_away = str(away_wins) + "-" + str(away_draws) + "-" + str(away_losses) + ", " + str(away_points) + "p, " + str(away_scores_for) + ":" + str(away_scores_against)
@@ -116,13 +121,14 @@ def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFra
     col_6_away = coach_away['name'] + ", " + str(coach_away['wins']) + " (" + str(win_percentage_away) + "%) - " + str(coach_away['draws']) + " (" + str(draw_percentage_away) + "%) - " + str(coach_away['losses']) + " (" + str(loss_percentage_away) + "%)"
 
     # Format seventh column
-    # Not yet implemented
-    col_7_home = ''
-    col_7_away = ''
+    # Wins, draws and losses in the last meetings, then the scores latest first
+    col_7_home = format_head_to_head(head_to_head, home_team, away_team)
+    col_7_away = format_head_to_head(head_to_head, away_team, home_team)
 
     # Format eighth column
-    col_8_home = ", ".join(home_games_last_week)
-    col_8_away = ", ".join(away_games_last_week)
+    # Empty for a team the congestion index does not cover
+    col_8_home = ", ".join(game.strftime('%d %b. %y') for game in congestion.recent_games(home_team, 7, today)) if home_team in congestion else ''
+    col_8_away = ", ".join(game.strftime('%d %b. %y') for game in congestion.recent_games(away_team, 7, today)) if away_team in congestion else ''
 
     # Format ninth column
     col_9_home = ''
@@ -142,7 +148,19 @@ def format_data_to_table(home_team: str, away_team: str, total_score: pd.DataFra
 
 color_scale = ['#ff3300', '#ff5200', '#ff6800', '#fe7b00', '#f59200', '#e7a900', '#d2bf00', '#bbd300', '#91e800', '#00ff33']
 
-def format_conditional_styling(home_team: str, away_team: str, total_score: pd.DataFrame, home_score: pd.DataFrame, away_score: pd.DataFrame, last_five_games: dict, coach_home: dict, coach_away: dict, home_games_last_week: list[str], away_games_last_week: list[str]) -> dict:
+def format_head_to_head(head_to_head: HeadToHeadIndex, team: str, opponent: str) -> str:
+    """Returns the record and scores of team in its last meetings with opponent, as "1-1-0 (2:1, 1:1)", empty if they have not met."""
+    scores = head_to_head.scores(team, opponent)
+
+    if scores == []:
+        return ''
+
+    wins, draws, losses = head_to_head.record(team, opponent)
+
+    return str(wins) + "-" + str(draws) + "-" + str(losses) + " (" + ", ".join(str(goals_for) + ":" + str(goals_against) for goals_for, goals_against in scores) + ")"
+
+
+def format_conditional_styling(home_team: str, away_team: str, total_score: pd.DataFrame, home_score: pd.DataFrame, away_score: pd.DataFrame, last_five_games: dict, coach_home: dict, coach_away: dict, head_to_head: HeadToHeadIndex, congestion: CongestionIndex, today: date) -> dict:
     """
     Formats the cells of the dash data-table.
     """
@@ -151,8 +169,8 @@ def format_conditional_styling(home_team: str, away_team: str, total_score: pd.D
     minor_color = '#FF474C'
 
     # Format second column style
-    home_pos = total_score.loc[total_score['name'] == home_team, 'position'].values[0]
-    away_pos = total_score.loc[total_score['name'] == away_team, 'position'].values[0]
+    home_pos = total_score.at[home_team, 'position']
+    away_pos = total_score.at[away_team, 'position']
 
     column_2_style = [
         {
@@ -172,8 +190,8 @@ def format_conditional_styling(home_team: str, away_team: str, total_score: pd.D
     ]
 
     # Format column 3 style
-    home_points = home_score.loc[home_score['name'] == home_team, 'points'].values[0]
-    away_points = away_score.loc[away_score['name'] == away_team, 'points'].values[0]
+    home_points = home_score.at[home_team, 'points']
+    away_points = away_score.at[away_team, 'points']
 
     column_3_style = [
         {
@@ -252,22 +270,33 @@ def format_conditional_styling(home_team: str, away_team: str, total_score: pd.D
         }
     ]
 
-    # Format eighth column style
-    if away_games_last_week != [] and home_games_last_week == []:
-        date1 = datetime.strptime(away_games_last_week[0], '%d %b. %y')
-        date2 = datetime.strptime('01 Jan. 00', '%d %b. %y')
-
-    elif away_games_last_week == [] and home_games_last_week != []:
-        date1 = datetime.strptime('01 Jan. 00', '%d %b. %y')
-        date2 = datetime.strptime(home_games_last_week[0], '%d %b. %y')
+    # Format seventh column style
+    # The team with more wins in the last meetings is favoured
+    home_h2h_wins, _, away_h2h_wins = head_to_head.record(home_team, away_team)
 
-    elif away_games_last_week == [] and home_games_last_week == []:
-        date1 = datetime.strptime('01 Jan. 00', '%d %b. %y')
-        date2 = datetime.strptime('01 Jan. 00', '%d %b. %y')
+    # Left uncoloured when the teams have not met, the column is empty
+    column_7_style = [] if not head_to_head.meetings(home_team, away_team) else [
+        {
+            'if': {
+                'row_index': 0,
+                'column_id': f'{table_cols[6]}',
+            },
+            'backgroundColor': major_color if home_h2h_wins > away_h2h_wins else (mid_color if home_h2h_wins == away_h2h_wins else minor_color)
+        },
+        {
+            'if': {
+                'row_index': 1,
+                'column_id': f'{table_cols[6]}',
+            },
+            'backgroundColor': major_color if home_h2h_wins < away_h2h_wins else (mid_color if home_h2h_wins == away_h2h_wins else minor_color)
+        }
+    ]
 
-    else:
-        date1 = datetime.strptime(away_games_last_week[0], '%d %b. %y')
-        date2 = datetime.strptime(home_games_last_week[0], '%d %b. %y')
+    # Format eighth column style
+    # The team with more days of rest before the match is favoured, not styled unless both teams are covered
+    home_rest, away_rest = congestion.rest_days_pair(home_team, away_team, today)
+    home_rest = min(home_rest or max_rest_days, max_rest_days)
+    away_rest = min(away_rest or max_rest_days, max_rest_days)
 
     column_8_style = [
         {
@@ -275,18 +304,18 @@ def format_conditional_styling(home_team: str, away_team: str, total_score: pd.D
                 'row_index': 0,
                 'column_id': f'{table_cols[7]}',
             },
-            'backgroundColor': major_color if date1 > date2 else (mid_color if date1 == date2 else minor_color)
+            'backgroundColor': major_color if home_rest > away_rest else (mid_color if home_rest == away_rest else minor_color)
         },
         {
             'if': {
                 'row_index': 1,
                 'column_id': f'{table_cols[7]}',
             },
-            'backgroundColor': major_color if date1 < date2 else (mid_color if date1 == date2 else minor_color)
+            'backgroundColor': major_color if home_rest < away_rest else (mid_color if home_rest == away_rest else minor_color)
         }
-    ]
+    ] if home_team in congestion and away_team in congestion else []
   
-    return column_2_style + column_3_style + column_4_style + column_6_style + column_8_style
+    return column_2_style + column_3_style + column_4_style + column_6_style + column_7_style + column_8_style
 
 
 """
@@ -0,0 +1,48 @@
+import threading
+from flask import Flask, Response, request
+from scripts.metrics import payload_bytes, render
+
+"""
+Records the size of the request and response of every Dash callback and serves
+all metrics of the app on /metrics.
+
+Shows whether the payload of a callback grows with the number of matches on the page.
+"""
+
+# Callback output -> {'calls', 'request bytes', 'response bytes', 'last request bytes', 'last response bytes'}
+payload_sizes = {}
+_lock = threading.Lock()
+
+
+def record_payload_size(output: str, request_bytes: int, response_bytes: int) -> None:
+    with _lock:
+        sizes = payload_sizes.setdefault(output, {'calls': 0, 'request bytes': 0, 'response bytes': 0})
+
+        sizes['calls'] += 1
+        sizes['request bytes'] += request_bytes
+        sizes['response bytes'] += response_bytes
+        sizes['last request bytes'] = request_bytes
+        sizes['last response bytes'] = response_bytes
+
+    payload_bytes.observe(request_bytes, output, 'request')
+    payload_bytes.observe(response_bytes, output, 'response')
+
+
+def instrument_payloads(server: Flask) -> None:
+    """Records the payload sizes of the Dash callback requests handled by server."""
+
+    @server.after_request
+    def _record(response):
+        if request.path.endswith('/_dash-update-component') and not response.is_streamed:
+            body = request.get_json(silent=True) or {}
+            record_payload_size(body.get('output', ''), request.content_length or 0, response.calculate_content_length() or 0)
+
+        return response
+
+
+def add_metrics_route(server: Flask) -> None:
+    """Serves every metric in the Prometheus text format on /metrics."""
+
+    @server.route('/metrics')
+    def _metrics():
+        return Response(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,51 @@
+import os
+import threading
+import pandas as pd
+from scripts import config
+from scripts.cache import create_cache
+from .info import table_cols
+
+"""
+Server-side copy of the comparison tables of each browser session.
+
+Sessions are identified by the id in the session-id store and hold the table
+data and conditional styling of every match, so exports can be built on the
+server without the browser sending the tables.
+
+Sessions are kept in a cache of the backend in config, so with CACHE_BACKEND=shared
+an export can be served by any worker and survives a restart of the workers.
+"""
+
+sessions = create_cache({'session': config.SESSION_TTL}, config.SESSION_MAX_ENTRIES, os.path.join(config.CACHE_DIR, 'sessions'))
+_lock = threading.Lock()
+
+
+def save_table(session_id: str, index: int, data: list[dict], style: list = None) -> None:
+    """
+    Stores the table data of match index.
+
+    Style is kept from before if not given, e.g. when the user only edited cells.
+    """
+    # The session is read, changed and written back, the lock keeps other callbacks
+    # of the session, in this or another worker, from writing in between
+    with sessions.refresh_lock('session', session_id), _lock:
+        # Copied, the cached dict may be shared with other readers in the process
+        matches = dict(sessions.get('session', session_id) or {})
+        previous = matches.get(index, {})
+
+        matches[index] = {
+            'data': data,
+            'style': style if style is not None else previous.get('style', []),
+        }
+
+        sessions.set('session', session_id, matches)
+
+
+def get_matches(session_id: str, indices: list[int]) -> list[tuple[pd.DataFrame, list]]:
+    """Returns (table data, style) of the matches with indices that have data, in the given order."""
+    matches = sessions.get('session', session_id) or {}
+
+    return [
+        (pd.DataFrame(matches[index]['data'], columns=table_cols), matches[index]['style'])
+        for index in indices if index in matches and matches[index]['data']
+    ]
@@ -1,3 +1,17 @@
+import argparse
+import sys
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the football statistics app.")
+    parser.add_argument('--startup-report', action='store_true', help="print the import time per module at start and exit")
+    args = parser.parse_args()
+
+    if args.startup_report:
+        from dash_app.startup import startup_report
+
+        print(startup_report())
+        sys.exit()
+
 from dash_app import create_app
 
 app = create_app()
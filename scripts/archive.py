@@ -0,0 +1,186 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from datetime import date, datetime
+from pathlib import Path
+from . import config
+from .parsing import index_by_name
+from .snapshot import LeagueSnapshot
+
+"""
+Parquet archive of every league snapshot, to look at the tables as they were on a past date.
+
+Each distinct snapshot of a day is one file, partitioned by league, season and
+date as league=premier_league/season=2024-25/date=2024-10-16/<snapshot id>.parquet.
+The total, home and away scoreboards are stacked in the file with their name in
+column "table", the last five games are kept in column "form" of the total rows.
+
+Queries only open the partitions of the dates asked for and read only the
+columns asked for, files are memory-mapped.
+"""
+
+# First month of a season, e.g. August 2024 is in season 2024-25
+season_start_month = 7
+
+tables = ['total', 'home', 'away']
+
+
+def season_of(day: date) -> str:
+    """Returns the season of day, as "2024-25"."""
+    start = day.year if day.month >= season_start_month else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def partition_value(directory: Path) -> str:
+    """Returns the value of a hive partition directory, e.g. "2024-25" for season=2024-25."""
+    return directory.name.split('=', 1)[1]
+
+
+class SnapshotArchive:
+    """
+    Directory of Parquet files keeping every league snapshot, partitioned by league, season and date.
+
+    Files are written once and never changed, so readers need no locks.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _league_dir(self, league: str) -> Path:
+        return self.root / f"league={config.LEAGUE_SLUG[league]}"
+
+    def append_league_snapshot(self, league: str, snapshot: LeagueSnapshot) -> bool:
+        """
+        Appends the snapshot to the partition of the day it was scraped.
+
+        Snapshot ids are derived from the content, so the same tables are only archived
+        once per day. Returns True if a file was written, False if it was there or
+        could not be written.
+        """
+        try:
+            return self._write_league_snapshot(league, snapshot)
+
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error archiving snapshot of {league}: {e}")
+            return False
+
+    def _write_league_snapshot(self, league: str, snapshot: LeagueSnapshot) -> bool:
+        day = datetime.fromtimestamp(snapshot.scraped_at).date()
+        directory = self._league_dir(league) / f"season={season_of(day)}" / f"date={day.isoformat()}"
+        path = directory / f"{snapshot.id}.parquet"
+
+        if path.exists():
+            return False
+
+        parts = []
+        for name, df in zip(tables, (snapshot.total_table, snapshot.home_table, snapshot.away_table)):
+            part = df.assign(table=name)
+
+            # Last five games are only kept once, with the total scoreboard
+            if name == 'total':
+                part['form'] = [snapshot.last_five_games.get(team) for team in part['name']]
+
+            parts.append(part)
+
+        df = pd.concat(parts, ignore_index=True).assign(scraped_at=snapshot.scraped_at, id=snapshot.id)
+
+        # Written under a hidden name and moved in place, so readers never see a partial file
+        directory.mkdir(parents=True, exist_ok=True)
+        temporary = directory / f".{snapshot.id}.parquet.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), temporary)
+        os.replace(temporary, path)
+
+        return True
+
+    def dates(self, league: str) -> list[date]:
+        """Returns the dates with archived snapshots of league, oldest first."""
+        return sorted(
+            date.fromisoformat(partition_value(day))
+            for season in self._league_dir(league).glob('season=*')
+            for day in season.glob('date=*')
+        )
+
+    def _day_dir(self, league: str, until: date) -> Path | None:
+        """Returns the partition of the last day on or before until with a snapshot of league."""
+        # Seasons and ISO dates sort as strings, only the seasons up to until are listed
+        seasons = sorted(
+            (season for season in self._league_dir(league).glob('season=*') if partition_value(season) <= season_of(until)),
+            reverse=True,
+        )
+
+        for season in seasons:
+            days = [day for day in season.glob('date=*') if partition_value(day) <= until.isoformat()]
+
+            if days:
+                return max(days, key=partition_value)
+
+        return None
+
+    def league_snapshot_as_of(self, league: str, until: date) -> LeagueSnapshot | None:
+        """Returns the last snapshot of league scraped on or before until, None if there is none or it could not be read."""
+        try:
+            return self._read_league_snapshot(league, until)
+
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error reading archived snapshot of {league}: {e}")
+            return None
+
+    def _read_league_snapshot(self, league: str, until: date) -> LeagueSnapshot | None:
+        directory = self._day_dir(league, until)
+
+        if directory is None:
+            return None
+
+        table = pq.read_table(directory, memory_map=True, partitioning=None)
+
+        # Latest snapshot of the day
+        table = table.filter(pc.equal(table['scraped_at'], pc.max(table['scraped_at'])))
+
+        df = table.to_pandas()
+        scoreboards = {
+            name: index_by_name(df[df['table'] == name].drop(columns=['table', 'form', 'scraped_at', 'id']).reset_index(drop=True))
+            for name in tables
+        }
+
+        total = df[df['table'] == 'total']
+
+        return LeagueSnapshot(
+            total_table=scoreboards['total'],
+            home_table=scoreboards['home'],
+            away_table=scoreboards['away'],
+            last_five_games={team: list(form) for team, form in zip(total['name'], total['form']) if form is not None},
+            scraped_at=float(df['scraped_at'].iloc[0]),
+            id=df['id'].iloc[0],
+        )
+
+    def history(self, league: str, since: date, until: date, columns: list[str], table: str = 'total', teams: list[str] = None) -> pd.DataFrame:
+        """
+        Returns columns of the table rows of league archived from since to until, with the date and scrape time of each row.
+
+        Only the partitions of the dates between since and until and the columns
+        asked for are read. Rows can be limited to teams, e.g. to compare their
+        position or form over time.
+        """
+        filters = [('date', '>=', since.isoformat()), ('date', '<=', until.isoformat()), ('table', '=', table)]
+
+        if teams is not None:
+            filters.append(('name', 'in', teams))
+
+        directory = self._league_dir(league)
+        if not directory.exists():
+            return pd.DataFrame(columns=['date', 'scraped_at', 'name', *columns])
+
+        # Partition values are read as strings, so dates compare as ISO strings
+        partitioning = ds.partitioning(pa.schema([('season', pa.string()), ('date', pa.string())]), flavor='hive')
+
+        result = pq.read_table(directory, columns=['date', 'scraped_at', 'name', *columns], filters=filters,
+                               partitioning=partitioning, memory_map=True)
+
+        return result.to_pandas().sort_values(['scraped_at', 'name'], ignore_index=True)
+
+
+# None when disabled in config
+archive = SnapshotArchive(config.SNAPSHOT_ARCHIVE) if config.SNAPSHOT_ARCHIVE else None
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any
+from . import config
+from .metrics import cache_requests
+
+
+class TTLCache:
+    """
+    Thread-safe cache shared by all Dash sessions in the process.
+
+    Entries are keyed by (kind, key), e.g. ('league', 'Premier League'), and expire
+    after the time to live configured for their kind. When the cache is full the
+    least recently used entry is evicted.
+    """
+
+    def __init__(self, ttl: dict, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # (kind, key) -> (value, stored_at, expires_at), ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, kind: str, key: str) -> Any:
+        """Returns cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+
+            if entry is None or entry[2] < time.time():
+                self.misses += 1
+                cache_requests.inc(kind, 'miss')
+                return None
+
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            cache_requests.inc(kind, 'hit')
+            return entry[0]
+
+    def set(self, kind: str, key: str, value: Any, stored_at: float = None) -> None:
+        """
+        Stores value with the time to live of kind.
+
+        The entry expires the time to live after stored_at, by default now, e.g. the
+        scrape time of a snapshot loaded from the snapshot store.
+        """
+        if stored_at is None:
+            stored_at = time.time()
+
+        with self._lock:
+            self._entries[(kind, key)] = (value, stored_at, stored_at + self.ttl[kind])
+            self._entries.move_to_end((kind, key))
+
+            # Evict least recently used entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def last_refreshed(self, kind: str, key: str) -> float | None:
+        """Returns the timestamp when the entry was stored, or None if not cached."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            return entry[1] if entry is not None else None
+
+    def refresh_lock(self, kind: str, key: str):
+        """Returns a context manager held while refreshing an entry, see SharedCache.refresh_lock()."""
+        # No other worker shares this cache, so there is no one to wait for
+        return nullcontext()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def create_cache(ttl: dict, max_entries: int, directory: str) -> TTLCache:
+    """Returns a cache of the backend in config, with its files in directory if shared by all workers."""
+    if config.CACHE_BACKEND == 'shared':
+        # Only imported when used, it needs fcntl which is missing on Windows
+        from .shared_cache import SharedCache
+
+        return SharedCache(directory, ttl, max_entries)
+
+    return TTLCache(ttl, max_entries)
+
+
+cache = create_cache(config.CACHE_TTL, config.CACHE_MAX_ENTRIES, config.CACHE_DIR)
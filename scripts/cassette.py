@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Headers describing the body as sent over the wire, not as stored
+transport_headers = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+class Cassette:
+    """
+    Recorded HTTP responses, stored as gzipped JSON with url as key.
+
+    In record mode every response is stored with its status, headers and body.
+    In replay mode the stored responses are served instead of fetching, each
+    after latency seconds, so runs are reproducible and need no network.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0):
+        self.path = path
+        self.latency = latency
+        self._lock = threading.Lock()
+
+        # url -> {'status', 'headers', 'encoding', 'body'}
+        self.responses = {}
+
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                self.responses = json.load(f)
+
+    def record(self, url: str, response: requests.Response) -> None:
+        """Stores response for url and saves the cassette."""
+        # A 304 has no body, the recorded 200 of url is kept instead
+        if response.status_code == 304:
+            return
+
+        encoding = response.encoding or response.apparent_encoding
+
+        with self._lock:
+            self.responses[url] = {
+                'status': response.status_code,
+                'headers': {key: value for key, value in response.headers.items() if key.lower() not in transport_headers},
+                'encoding': encoding,
+                'body': response.content.decode(encoding or 'utf-8', errors='replace'),
+            }
+            self._save()
+
+    def replay(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        Returns the recorded response for url.
+
+        Answers with 304 Not Modified if the request validators match the recorded
+        ones, as the site would. Raises requests.ConnectionError if url was not recorded.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            recorded = self.responses.get(url)
+
+        if recorded is None:
+            raise requests.ConnectionError(f"No recorded response for {url} in {self.path}")
+
+        response = requests.Response()
+        response.url = url
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response.encoding = recorded['encoding']
+        response.status_code = recorded['status']
+        response._content = recorded['body'].encode(recorded['encoding'] or 'utf-8')
+
+        # Same validators as sent by the client from the recorded response
+        headers = CaseInsensitiveDict(headers or {})
+        etag, last_modified = response.headers.get('etag'), response.headers.get('last-modified')
+
+        if (etag is not None and headers.get('if-none-match') == etag) or \
+                (last_modified is not None and headers.get('if-modified-since') == last_modified):
+            response.status_code = 304
+            response._content = b''
+
+        return response
+
+    def _save(self) -> None:
+        # Written to a temporary file first so a crash never leaves a half written cassette
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = f"{self.path}.tmp"
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as f:
+            json.dump(self.responses, f)
+
+        os.replace(temporary_path, self.path)
@@ -1,4 +1,6 @@
+import getpass
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,6 +14,8 @@ AWAY_URL = os.getenv("AWAY_URL")
 LEAGUE_URL = os.getenv("LEAGUE_URL")
 PREMIER_LEAGUE_URL = os.getenv("PREMIER_LEAGUE_URL")
 TEAM_URL = os.getenv("TEAM_URL")
+# Page with the past results of a team, the team slug is appended
+RESULTS_URL = os.getenv("RESULTS_URL")
 
 HEADERS = {
     'accept': '*/*',
@@ -29,6 +33,36 @@ HEADERS = {
     'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
 }
 
+# HTTP client
+# Connections kept alive per host, requests wait for a free connection when all are in use
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+# Seconds to wait for connecting and for the server to send data respectively
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+# Retries on 5xx and connection errors, with jittered exponential backoff in seconds
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 8))
+
+# live fetches from the site, record also stores every response in the cassette,
+# replay serves the responses stored in the cassette without network access
+HTTP_MODE = os.getenv("HTTP_MODE", "live")
+# Gzipped JSON file with the recorded responses
+HTTP_CASSETTE = os.getenv("HTTP_CASSETTE", "cassettes/http.json.gz")
+# Seconds added to every replayed response, to mimic the site
+HTTP_REPLAY_LATENCY = float(os.getenv("HTTP_REPLAY_LATENCY", 0))
+
+# Requests per second sent to each host, and requests that may be sent at once after an idle period
+# With CACHE_BACKEND=shared the limits hold for all worker processes on the host together,
+# with the memory backend they hold per worker process
+HTTP_RATE = float(os.getenv("HTTP_RATE", 5))
+HTTP_BURST = float(os.getenv("HTTP_BURST", 10))
+# Maximum number of requests waiting for a response from each host
+HTTP_MAX_IN_FLIGHT = int(os.getenv("HTTP_MAX_IN_FLIGHT", 4))
+
+# Maximum number of pages fetched concurrently by one call
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 4))
+
 # Slug
 
 LEAGUE_SLUG = {
@@ -89,4 +123,70 @@ CHAMPIONSHIP_SLUG = {
     'Rotherham United': 'rotherham-united', 
 }
 
-ALL_TEAMS_SLUG = {**PREMIER_LEAGUE_SLUG, **CHAMPIONSHIP_SLUG}
\ No newline at end of file
+ALL_TEAMS_SLUG = {**PREMIER_LEAGUE_SLUG, **CHAMPIONSHIP_SLUG}
+
+# Teams of each league, e.g. for the congestion index of a league
+LEAGUE_TEAMS = {
+    'Premier League': list(PREMIER_LEAGUE_SLUG.keys()),
+    'Championship': list(CHAMPIONSHIP_SLUG.keys()),
+}
+
+# Meetings of two teams shown in the head to head column
+HEAD_TO_HEAD_MEETINGS = int(os.getenv("HEAD_TO_HEAD_MEETINGS", 3))
+
+# Cache
+# Time to live in seconds for each kind of cached data
+CACHE_TTL = {
+    'league': int(os.getenv("CACHE_TTL_LEAGUE", 15 * 60)),
+    'coach': int(os.getenv("CACHE_TTL_COACH", 6 * 60 * 60)),
+    'match dates': int(os.getenv("CACHE_TTL_MATCH_DATES", 60 * 60)),
+    # Congestion index of a league, rebuilt when its teams are refreshed
+    'congestion': int(os.getenv("CACHE_TTL_CONGESTION", 60 * 60)),
+    # Past results only change once per match day
+    'results': int(os.getenv("CACHE_TTL_RESULTS", 6 * 60 * 60)),
+    # Teams whose results page could not be fetched, so callbacks do not fetch it again on every call
+    'failed results': int(os.getenv("CACHE_TTL_FAILED_RESULTS", 5 * 60)),
+    # Head-to-head index of a league, rebuilt when the results of its teams are refreshed
+    'head to head': int(os.getenv("CACHE_TTL_HEAD_TO_HEAD", 6 * 60 * 60)),
+    # League snapshots by id, kept longer than 'league' so open sessions can still resolve them
+    'snapshot': int(os.getenv("CACHE_TTL_SNAPSHOT", 6 * 60 * 60)),
+}
+
+# Maximum number of entries before the least recently used are evicted
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+
+# memory keeps the cache in the process, shared keeps it in files in CACHE_DIR
+# used by all worker processes on the host, e.g. when running several gunicorn workers
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# Must be owned by the user running the app and not writable by others, see shared_cache.py
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), f"football-cache-{getpass.getuser()}"))
+
+
+# Start-up
+# Import the scraping stack, load stored snapshots and start the warm-up in the background at start,
+# otherwise the scraping stack is imported by the first callback using it
+PRELOAD_ENABLED = os.getenv("PRELOAD_ENABLED", "1") == "1"
+
+# Warm-up
+# Background refresh of every league and team page in the slug dicts
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+# Seconds between refreshes, should be shorter than the cache time to live to keep entries warm
+WARMUP_INTERVAL = int(os.getenv("WARMUP_INTERVAL", 10 * 60))
+# Number of processes parsing the fetched pages
+WARMUP_PROCESSES = int(os.getenv("WARMUP_PROCESSES", 2))
+
+# Comparisons
+# Seconds the comparison tables of a browser session are kept on the server for export
+SESSION_TTL = int(os.getenv("SESSION_TTL", 12 * 60 * 60))
+# Maximum number of browser sessions kept on the server
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", 1000))
+
+# Snapshot store
+# SQLite file keeping every scraped snapshot, empty to disable
+SNAPSHOT_DB = os.getenv("SNAPSHOT_DB", "snapshots.db")
+# Snapshots younger than this many seconds are loaded into the cache at start
+SNAPSHOT_DB_MAX_AGE = int(os.getenv("SNAPSHOT_DB_MAX_AGE", 6 * 60 * 60))
+
+# Snapshot archive
+# Directory of the Parquet archive of every league snapshot, for the tables as of a past date, empty to disable
+SNAPSHOT_ARCHIVE = os.getenv("SNAPSHOT_ARCHIVE", "archive")
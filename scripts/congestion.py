@@ -0,0 +1,71 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+"""
+Fixture congestion of every team in a league, from the match dates on the team pages.
+
+The dates are parsed once per refresh of the team pages and kept per team as a sorted
+array of day numbers, so every question below is a binary search.
+"""
+
+
+class CongestionIndex:
+    """
+    Sorted match days (date.toordinal()) of every team, built from dict with team as
+    key and list of ISO dates as value.
+
+    Answers games played in the last days and days of rest before a fixture in
+    O(log n) of the number of matches of the team.
+    """
+
+    def __init__(self, match_dates: dict[str, list[str]]):
+        self.days = {
+            team: array('l', sorted(date.fromisoformat(match_date).toordinal() for match_date in dates))
+            for team, dates in match_dates.items()
+        }
+
+    def __contains__(self, team: str) -> bool:
+        return team in self.days
+
+    def covering(self, days: int, today: date) -> 'CongestionIndex':
+        """
+        Returns an index of only the teams whose match days reach back to the days before and including today.
+
+        A team page lists a limited number of matches, so for a past date a team whose
+        first listed match is later than the days asked about may have played more.
+        """
+        start = today.toordinal() - days + 1
+
+        index = CongestionIndex({})
+        index.days = {team: team_days for team, team_days in self.days.items() if team_days and team_days[0] <= start}
+
+        return index
+
+    def _days(self, team: str) -> array:
+        # Teams without dates have played no matches as far as the index knows
+        return self.days.get(team, array('l'))
+
+    def recent_games(self, team: str, days: int, today: date) -> list[date]:
+        """Returns the dates of the games of team in the days before and including today, latest first."""
+        team_days = self._days(team)
+        start = bisect_left(team_days, today.toordinal() - days + 1)
+        end = bisect_right(team_days, today.toordinal())
+
+        return [date.fromordinal(day) for day in reversed(team_days[start:end])]
+
+    def games_in_last(self, team: str, days: int, today: date) -> int:
+        """Returns the number of games of team in the days before and including today."""
+        team_days = self._days(team)
+        return bisect_right(team_days, today.toordinal()) - bisect_left(team_days, today.toordinal() - days + 1)
+
+    def rest_days(self, team: str, fixture: date) -> int | None:
+        """Returns the days between the last game of team before fixture and fixture, None if there was none."""
+        team_days = self._days(team)
+        index = bisect_left(team_days, fixture.toordinal())
+
+        return fixture.toordinal() - team_days[index - 1] if index > 0 else None
+
+    def rest_days_pair(self, home_team: str, away_team: str, fixture: date) -> tuple[int | None, int | None]:
+        """Returns the days of rest of the home and away team before their fixture."""
+        return self.rest_days(home_team, fixture), self.rest_days(away_team, fixture)
@@ -0,0 +1,180 @@
+import os
+import random
+import threading
+import time
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from . import config
+from .cassette import Cassette
+from .governor import RateGovernor, SharedBucket
+from .metrics import conditional_requests, fetch_seconds
+
+
+class HttpClient:
+    """
+    HTTP client shared by all fetches.
+
+    Keeps connections alive in a bounded pool, applies connect/read timeouts and
+    retries 5xx responses and connection errors with jittered exponential backoff.
+
+    With a cassette, mode 'record' stores every response in the cassette and mode
+    'replay' serves the stored responses without any network access.
+
+    With a governor, every request sent, retries included, waits for the rate and
+    concurrency limits of its host.
+    """
+
+    def __init__(self, headers: dict, pool_size: int, connect_timeout: float, read_timeout: float,
+                 max_retries: int, backoff: float, backoff_max: float, mode: str = 'live', cassette: Cassette = None,
+                 governor: RateGovernor = None):
+        if mode not in ('live', 'record', 'replay'):
+            raise ValueError(f"Unknown HTTP mode {mode}, expected live, record or replay")
+
+        if mode != 'live' and cassette is None:
+            raise ValueError(f"HTTP mode {mode} needs a cassette")
+
+        self.mode = mode
+        self.cassette = cassette
+        self.governor = governor
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+
+        # Headers with missing environment variables are left out
+        self.session.headers.update({key: value for key, value in headers.items() if value is not None})
+
+        # pool_block makes requests wait for a free connection instead of opening extra ones
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # url -> validators (ETag and Last-Modified) of the last 200 response of a revalidated url
+        self.validators = {}
+        self._validators_lock = threading.Lock()
+
+    def get(self, url: str, headers: dict = None, revalidate: bool = False) -> requests.Response:
+        """
+        Gets url, retrying on 5xx status codes and connection errors.
+
+        With revalidate, the validators of the last 200 response of url are sent as
+        If-None-Match / If-Modified-Since and the response may be 304 Not Modified.
+
+        Returns the last response, raises requests.RequestException if the last attempt failed to connect.
+        """
+        if revalidate:
+            headers = {**(headers or {}), **self.conditional_headers(url)}
+
+        start = time.perf_counter()
+        status = 'error'
+
+        try:
+            if self.mode == 'replay':
+                response = self.cassette.replay(url, headers)
+
+            else:
+                response = self._get(url, headers)
+
+                if self.mode == 'record':
+                    self.cassette.record(url, response)
+
+            status = response.status_code
+
+        finally:
+            fetch_seconds.observe(time.perf_counter() - start, urlsplit(url).hostname, status)
+
+        if revalidate:
+            self._update_validators(url, headers, response)
+
+        return response
+
+    def _get(self, url: str, headers: dict) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._send(url, headers)
+
+                if response.status_code < 500 or attempt == self.max_retries:
+                    return response
+
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+
+            time.sleep(self.backoff_delay(attempt))
+
+    def _send(self, url: str, headers: dict) -> requests.Response:
+        if self.governor is None:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+        with self.governor.slot(urlsplit(url).hostname):
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def conditional_headers(self, url: str) -> dict:
+        """Returns If-None-Match / If-Modified-Since headers for url, empty if no validators are stored."""
+        with self._validators_lock:
+            validators = self.validators.get(url, {})
+
+        headers = {}
+        if 'etag' in validators:
+            headers['if-none-match'] = validators['etag']
+        if 'last-modified' in validators:
+            headers['if-modified-since'] = validators['last-modified']
+
+        return headers
+
+    def _update_validators(self, url: str, headers: dict, response: requests.Response) -> None:
+        # The share answered with 304 Not Modified is the hit rate of the revalidation
+        if 'if-none-match' in headers or 'if-modified-since' in headers:
+            conditional_requests.inc(urlsplit(url).hostname, 'not modified' if response.status_code == 304 else 'modified')
+
+        with self._validators_lock:
+            if response.status_code == 200:
+                validators = {key: response.headers[key] for key in ('etag', 'last-modified') if key in response.headers}
+
+                if validators:
+                    self.validators[url] = validators
+                else:
+                    self.validators.pop(url, None)
+
+    def stored_validators(self, url: str) -> dict:
+        """Returns the validators of url, empty if none are stored."""
+        with self._validators_lock:
+            return dict(self.validators.get(url, {}))
+
+    def restore_validators(self, url: str, validators: dict) -> None:
+        """Stores validators of url kept from before a restart, the next request of url revalidates."""
+        with self._validators_lock:
+            self.validators[url] = dict(validators)
+
+    def forget(self, url: str) -> None:
+        """Drops the validators of url so the next request downloads the full page."""
+        with self._validators_lock:
+            self.validators.pop(url, None)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Returns a random delay up to the exponential backoff of attempt ("full jitter")."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+
+client = HttpClient(
+    config.HEADERS,
+    pool_size=config.HTTP_POOL_SIZE,
+    connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=config.HTTP_READ_TIMEOUT,
+    max_retries=config.HTTP_MAX_RETRIES,
+    backoff=config.HTTP_BACKOFF,
+    backoff_max=config.HTTP_BACKOFF_MAX,
+    mode=config.HTTP_MODE,
+    cassette=Cassette(config.HTTP_CASSETTE, config.HTTP_REPLAY_LATENCY) if config.HTTP_MODE != 'live' else None,
+    governor=RateGovernor(
+        config.HTTP_RATE, config.HTTP_BURST, config.HTTP_MAX_IN_FLIGHT,
+        # With the shared cache the workers of the host also share the limits
+        bucket=SharedBucket(
+            os.path.join(config.CACHE_DIR, 'governor'), config.HTTP_RATE, config.HTTP_BURST, config.HTTP_MAX_IN_FLIGHT,
+            slot_timeout=(config.HTTP_CONNECT_TIMEOUT + config.HTTP_READ_TIMEOUT) * 2,
+        ) if config.CACHE_BACKEND == 'shared' else None,
+    ),
+)
@@ -0,0 +1,235 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .metrics import fetch_queue_seconds
+
+"""
+Limits the requests sent to each upstream host.
+
+Every request takes a token from the bucket of its host, refilled at a fixed rate
+up to a burst, and a slot of the requests in flight to the host. Requests waiting
+for either are served by lane, interactive callbacks before background refreshes,
+and in arrival order within a lane.
+
+With a SharedBucket the tokens and slots are kept in a file per host shared by all
+worker processes, so the limits hold for the whole host and not per worker. Lanes
+are then kept within each worker.
+"""
+
+# Lane -> priority, lower is served first
+lanes = {'interactive': 0, 'background': 1}
+
+# Lane of the requests made by the current thread or task
+current_lane = ContextVar('lane', default='interactive')
+
+
+@contextmanager
+def in_lane(name: str):
+    """Sends the requests made in the block in lane name."""
+    token = current_lane.set(name)
+    try:
+        yield
+
+    finally:
+        current_lane.reset(token)
+
+
+class HostState:
+    """Token bucket, requests in flight and waiting requests of one host."""
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+
+        # Heap of (priority, arrival) of the waiting requests
+        self.queue = []
+
+
+class SharedBucket:
+    """
+    Token bucket and requests in flight of each host, in a file under directory locked by every process using it.
+
+    Slots of processes that exited, or held longer than slot_timeout seconds, are
+    freed when the file is next read, so a killed worker does not keep its slots.
+    """
+
+    def __init__(self, directory: str, rate: float, burst: float, max_in_flight: int, slot_timeout: float):
+        # Only imported when used, fcntl is missing on Windows
+        from .shared_cache import private_directory
+
+        private_directory(directory)
+
+        self.directory = directory
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.slot_timeout = slot_timeout
+
+    @contextmanager
+    def _state(self, host: str):
+        """Yields the state of host as a dict under an exclusive lock, and writes it back."""
+        import fcntl
+
+        path = os.path.join(self.directory, hashlib.sha1(host.encode('utf-8')).hexdigest() + '.bucket')
+
+        with open(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), 'r+') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(f.read())
+
+                except ValueError:
+                    # New file
+                    state = {'tokens': self.burst, 'refilled_at': time.time(), 'in_flight': []}
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+
+                # Written before the lock is released, the next process reads it right away
+                f.flush()
+
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _alive(self, pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+
+        except ProcessLookupError:
+            return False
+
+        except PermissionError:
+            pass
+
+        return True
+
+    def try_acquire(self, host: str) -> float:
+        """Takes a token and a slot of host, returns 0 if taken, else the seconds to wait before trying again."""
+        now = time.time()
+
+        with self._state(host) as state:
+            state['in_flight'] = [(pid, started_at) for pid, started_at in state['in_flight']
+                                  if now - started_at < self.slot_timeout and self._alive(pid)]
+
+            state['tokens'] = min(self.burst, state['tokens'] + max(0.0, now - state['refilled_at']) * self.rate)
+            state['refilled_at'] = now
+
+            if len(state['in_flight']) >= self.max_in_flight:
+                # Slots are freed by other processes, which can not notify this one
+                return 0.05
+
+            if state['tokens'] < 1:
+                return (1 - state['tokens']) / self.rate
+
+            state['tokens'] -= 1
+            state['in_flight'].append((os.getpid(), now))
+
+            return 0
+
+    def release(self, host: str) -> None:
+        """Frees the oldest slot of host held by this process."""
+        pid = os.getpid()
+
+        with self._state(host) as state:
+            for i, (slot_pid, _) in enumerate(state['in_flight']):
+                if slot_pid == pid:
+                    del state['in_flight'][i]
+                    break
+
+
+class RateGovernor:
+    """
+    Token bucket and concurrency limit per host, with priority lanes.
+
+    rate is the requests per second allowed to each host, burst the requests that
+    may be sent at once after an idle period and max_in_flight the requests to a
+    host that may be waiting for their response at the same time.
+
+    With bucket, the tokens and slots are taken from the SharedBucket of all
+    processes instead of from this process only.
+    """
+
+    def __init__(self, rate: float, burst: float, max_in_flight: int, bucket: SharedBucket = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.bucket = bucket
+
+        self._hosts = {}
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, state: HostState) -> None:
+        now = time.monotonic()
+        state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+        state.refilled_at = now
+
+    def acquire(self, host: str) -> float:
+        """Waits until a request to host may be sent in the current lane, returns the seconds waited."""
+        lane = current_lane.get()
+        start = time.monotonic()
+
+        with self._condition:
+            state = self._hosts.setdefault(host, HostState(self.burst))
+            ticket = (lanes[lane], next(self._arrivals))
+            heapq.heappush(state.queue, ticket)
+
+            while True:
+                timeout = None
+
+                # Only the first waiting request may go, so lanes and arrival order are kept
+                if state.queue[0] == ticket and state.in_flight < self.max_in_flight:
+                    if self.bucket is not None:
+                        wait = self.bucket.try_acquire(host)
+                    else:
+                        self._refill(state)
+                        wait = 0 if state.tokens >= 1 else (1 - state.tokens) / self.rate
+
+                    if wait == 0:
+                        if self.bucket is None:
+                            state.tokens -= 1
+
+                        state.in_flight += 1
+                        heapq.heappop(state.queue)
+
+                        # The next waiting request may be able to go too
+                        self._condition.notify_all()
+                        break
+
+                    # Time until the next token or, with a shared bucket, until trying again
+                    timeout = wait
+
+                self._condition.wait(timeout)
+
+        waited = time.monotonic() - start
+        fetch_queue_seconds.observe(waited, host, lane)
+
+        return waited
+
+    def release(self, host: str) -> None:
+        if self.bucket is not None:
+            self.bucket.release(host)
+
+        with self._condition:
+            self._hosts[host].in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, host: str):
+        """Holds a request slot of host while the block sends the request."""
+        self.acquire(host)
+        try:
+            yield
+
+        finally:
+            self.release(host)
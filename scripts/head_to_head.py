@@ -0,0 +1,59 @@
+from datetime import date
+
+"""
+Recent meetings between every pair of teams, from the results pages of the teams.
+
+The results are indexed once per refresh of the results pages, so looking up the
+meetings of two teams is one dict lookup no matter which team plays at home.
+"""
+
+
+class HeadToHeadIndex:
+    """
+    Most recent meetings of every pair of teams, built from dict with team as key and
+    list of (ISO date, home team, away team, home goals, away goals) as value.
+
+    Pairs are keyed by frozenset of the two teams and keep at most meetings tuples,
+    latest first. A match found on the pages of both teams is counted once. With
+    until, only matches played on or before that date are kept.
+    """
+
+    def __init__(self, results: dict[str, list[tuple]], meetings: int = 3, until: date = None):
+        # Teams whose results are in the index, a team without meetings is still known
+        self.teams = set(results)
+
+        found = {tuple(result) for team_results in results.values() for result in team_results}
+
+        # ISO dates compare as strings
+        if until is not None:
+            found = {result for result in found if result[0] <= until.isoformat()}
+
+        pairs = {}
+        for result in found:
+            pairs.setdefault(frozenset(result[1:3]), []).append(result)
+
+        # Latest first
+        self.pairs = {pair: tuple(sorted(found, reverse=True)[:meetings]) for pair, found in pairs.items()}
+
+    def __contains__(self, team: str) -> bool:
+        return team in self.teams
+
+    def meetings(self, team: str, opponent: str) -> tuple:
+        """Returns the most recent meetings of team and opponent, latest first."""
+        return self.pairs.get(frozenset((team, opponent)), ())
+
+    def scores(self, team: str, opponent: str) -> list[tuple[int, int]]:
+        """Returns (goals for, goals against) of team in its most recent meetings with opponent, latest first."""
+        return [
+            (home_goals, away_goals) if home == team else (away_goals, home_goals)
+            for _, home, _, home_goals, away_goals in self.meetings(team, opponent)
+        ]
+
+    def record(self, team: str, opponent: str) -> tuple[int, int, int]:
+        """Returns the wins, draws and losses of team in its most recent meetings with opponent."""
+        scores = self.scores(team, opponent)
+
+        wins = sum(goals_for > goals_against for goals_for, goals_against in scores)
+        draws = sum(goals_for == goals_against for goals_for, goals_against in scores)
+
+        return wins, draws, len(scores) - wins - draws
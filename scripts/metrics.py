@@ -0,0 +1,160 @@
+import bisect
+import functools
+import threading
+import time
+
+"""
+Counters and histograms rendered in the Prometheus text format.
+
+Every metric is created once at import and registered in metrics, the /metrics
+route of the app renders them all. Recording takes a lock and a few additions,
+so it is cheap enough to time every call of a function.
+"""
+
+# Latency buckets in seconds, the Prometheus defaults with a longer tail for slow fetches
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Size buckets in bytes
+size_buckets = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# All metrics, in the order they are rendered
+metrics = []
+
+
+def escape(value) -> str:
+    """Returns value as a label value, with backslashes, quotes and newlines escaped."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labelnames: tuple, values: tuple) -> str:
+    """Returns {name="value",...}, empty if there are no labels."""
+    pairs = [name + '="' + escape(value) + '"' for name, value in zip(labelnames, values)]
+
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonically increasing count per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+        # label values -> count
+        self._values = {}
+        self._lock = threading.Lock()
+
+        metrics.append(self)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+
+        return lines
+
+
+class Histogram:
+    """Distribution of observed values per combination of label values, counted in cumulative buckets."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = latency_buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+        # label values -> [count per bucket (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+        metrics.append(self)
+
+    def observe(self, value: float, *labels) -> None:
+        # Index of the first bucket the value fits in, counts are made cumulative when rendered
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            if labels not in self._values:
+                self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+
+            counts_and_sum = self._values[labels]
+            counts_and_sum[0][index] += 1
+            counts_and_sum[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames + ('le',), labels + (bound,))} {cumulative}")
+
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}")
+
+        return lines
+
+
+def timed(histogram: Histogram):
+    """
+    Decorator observing the duration of every call in histogram, labelled with the qualified function name.
+
+    Calls raising an exception are observed too.
+    """
+    def decorator(function):
+        # e.g. LeagueSnapshot.from_html for methods
+        name = function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+
+        return wrapper
+
+    return decorator
+
+
+def render() -> str:
+    """Returns every metric in the Prometheus text format."""
+    lines = []
+    for metric in metrics:
+        lines += metric.render()
+
+    return '\n'.join(lines) + '\n'
+
+
+callback_seconds = Histogram('football_callback_duration_seconds', "Time spent in Dash callbacks.", ('callback',))
+
+function_seconds = Histogram('football_function_duration_seconds', "Time spent in scraper and parser functions.", ('function',))
+
+fetch_queue_seconds = Histogram('football_fetch_queue_seconds', "Time requests waited for the rate governor before being sent.", ('host', 'lane'))
+
+fetch_seconds = Histogram('football_fetch_duration_seconds', "Time of upstream fetches including retries.", ('host', 'status'))
+
+region_fallbacks = Counter('football_region_fallbacks_total', "Pages parsed in full because their regions were not found.", ('page',))
+
+empty_pages = Counter('football_empty_pages_total', "Fetched pages on which nothing was found to parse, e.g. after the markup of the site changed.", ('page',))
+
+coalesced_calls = Counter('football_coalesced_calls_total', "Fetches that waited for the same fetch in flight instead of fetching.", ('kind',))
+
+conditional_requests = Counter('football_conditional_requests_total', "Conditional upstream requests by host and result (modified or not modified).", ('host', 'result'))
+
+cache_requests = Counter('football_cache_requests_total', "Cache lookups by kind and result (hit or miss).", ('kind', 'result'))
+
+payload_bytes = Histogram('football_callback_payload_bytes', "Size of Dash callback requests and responses.", ('callback', 'direction'), size_buckets)
@@ -1,4 +1,19 @@
 import pandas as pd
+from datetime import date, datetime
+from .metrics import function_seconds, timed
+
+
+def index_by_name(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indexes scoreboard by team name, keeping the name column.
+
+    Lets helpers look up a team with df.at[team, column] instead of scanning the name column.
+    """
+    if 'name' in df.columns:
+        df = df.set_index('name', drop=False)
+        df.index.name = None
+
+    return df
 
 
 def parse_total_score(json_response: dict) -> pd.DataFrame: 
@@ -28,7 +43,7 @@ def parse_total_score(json_response: dict) -> pd.DataFrame:
         }
         teams.append(team)
         
-    df = pd.DataFrame(teams)
+    df = index_by_name(pd.DataFrame(teams))
 
     return df
 
@@ -58,11 +73,12 @@ def parse_home_away_score(json_response: dict) -> pd.DataFrame:
         }
         teams.append(team)
         
-    df = pd.DataFrame(teams)
+    df = index_by_name(pd.DataFrame(teams))
 
     return df
 
 
+@timed(function_seconds)
 def parse_scraped_scoreboard(table_div: str) -> pd.DataFrame:
     """
     Parses scraped scoreboard in table_div.
@@ -91,6 +107,124 @@ def parse_scraped_scoreboard(table_div: str) -> pd.DataFrame:
         
         teams.append(team)
 
-    df = pd.DataFrame(teams)
+    df = index_by_name(pd.DataFrame(teams))
+
+    return df
+
+@timed(function_seconds)
+def parse_last_five_games(table) -> dict:
+    """
+    Parses the last five games in the form table node.
+
+    Returns dict with team as key and list of results as value.
+    """
+
+    # Gets all rows in table
+    rows = table.css("td.name")
+
+    results = {}
+    for row in rows:
+        # Team name found in span with class team-name
+        team = row.css_first("span.team-name").text()
+
+        # match results are in 5 spans with class bg-match-res
+        # the result is the last class of the span
+        results[team] = [span.attributes['class'].split(' ')[-1] for span in row.css("span.bg-match-res")]
+
+    return results
+
+
+@timed(function_seconds)
+def parse_coach(div) -> dict:
+    """
+    Parses coach statistics in div#mod_coachStats node.
+
+    Returns dict with name, matches, wins, draws, losses or empty dict if not found.
+    """
+
+    # In some cases, there is no coach statistics on the site.
+    # In such a case "div" will be None and we get an AttributeError
+    # when calling css_first().
+    try:
+        name = div.css_first('p.mb5').text()
+
+        data = div.css('div.main-line.mt10.mb5')
+
+        return {
+            'name': name,
+            'matches': int(data[0].text()),
+            'wins': int(data[1].text()),
+            'draws': int(data[2].text()),
+            'losses': int(data[3].text()),
+        }
+
+    except AttributeError:
+        return {}
+
+
+def parse_match_date(text: str, today: date) -> date:
+    """
+    Parses a date such as "16 Oct." from the spree content.
+
+    The site leaves out the year, so the year putting the date closest to today is
+    used, e.g. "30 Dec." seen on 2 January is in the previous year. Raises ValueError
+    if text is not a date.
+    """
+    candidates = []
+
+    for year in (today.year - 1, today.year, today.year + 1):
+        # 29 Feb. only exists in leap years
+        try:
+            candidates.append(datetime.strptime(f"{text} {year}", '%d %b. %Y').date())
+
+        except ValueError:
+            pass
+
+    if candidates == []:
+        raise ValueError(f"Not a match date: {text}")
+
+    return min(candidates, key=lambda candidate: abs((candidate - today).days))
+
+
+@timed(function_seconds)
+def parse_match_dates(divs: list, today: date) -> list[str]:
+    """
+    Parses the dates in the date divs of the spree content.
+
+    Returns the dates of past and upcoming games in ISO format, in page order.
+    """
+    return [parse_match_date(div.text(), today).isoformat() for div in divs]
+
+
+@timed(function_seconds)
+def parse_results(table) -> list[tuple[str, str, str, int, int]]:
+    """
+    Parses the played matches in the results table node of a team.
+
+    Returns list of (ISO date, home team, away team, home goals, away goals), in page
+    order. Upcoming matches have no score and are left out, as is an empty list if
+    the table is not found.
+    """
+    # The page has no results table if the team has no matches
+    if table is None:
+        return []
+
+    results = []
+
+    for row in table.css("tr.row-body"):
+        try:
+            # Score is shown as "2 - 1", upcoming matches show the kick-off time instead
+            home_goals, away_goals = (int(goals) for goals in row.css_first("td.marker").text().split('-'))
+
+            results.append((
+                datetime.strptime(row.css_first("td.date").text().strip(), '%d/%m/%Y').date().isoformat(),
+                row.css_first("td.team-home span.team-name").text().strip(),
+                row.css_first("td.team-away span.team-name").text().strip(),
+                home_goals,
+                away_goals,
+            ))
+
+        except (AttributeError, ValueError):
+            continue
 
-    return df
\ No newline at end of file
+    return results
@@ -0,0 +1,170 @@
+import bisect
+import re
+
+"""
+Locates the parts of a page the parsers need before the page is parsed.
+
+League and team pages are mostly scripts, ads and navigation. Scanning the raw
+text for the opening tag of each needed element and its matching closing tag is
+much cheaper than building the DOM of the whole page, so only those fragments
+are handed to selectolax.
+
+Scripts, styles and comments are skipped while scanning, so tags written in them,
+e.g. document.write("</div>"), are not taken for tags of the page.
+"""
+
+# Opening of the spans whose content is not markup, searched in the lowercased page, and the text closing each
+skipped_opening = re.compile(r'<(script|style|!--)')
+skipped_closing = {'script': '</script', 'style': '</style', '!--': '-->'}
+
+
+def opening_tag(tag: str, classes: tuple = (), element_id: str = None) -> re.Pattern:
+    """
+    Returns pattern matching the opening tag of tag with all of classes, or with element_id.
+
+    Same elements as the css selectors tag.class1.class2 and tag#element_id, as long
+    as the attribute is written in double quotes.
+    """
+    pattern = rf'<{tag}\b[^>]*?'
+
+    if element_id is not None:
+        pattern += rf'\bid="{re.escape(element_id)}"'
+
+    if classes:
+        # Each class is a whole word of the class attribute, in any order
+        pattern += r'\bclass="' + ''.join(rf'(?=(?:[^"]*\s)?{re.escape(name)}[\s"])' for name in classes)
+
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def skipped_spans(text: str) -> list[tuple[int, int]]:
+    """
+    Returns (start, end) of the scripts, styles and comments in text, in order.
+
+    The closing text of each span is found with str.find, so the content of scripts
+    is not scanned for tags. A span that is never closed runs to the end of text.
+    """
+    lower = text.lower()
+    spans = []
+    position = 0
+
+    while True:
+        match = skipped_opening.search(lower, position)
+        if match is None:
+            return spans
+
+        closing = skipped_closing[match.group(1)]
+        end = lower.find(closing, match.end())
+
+        if end == -1:
+            spans.append((match.start(), len(text)))
+            return spans
+
+        # Closing tags end at the next ">", comments right after "-->"
+        end = end + len(closing) if closing == '-->' else (lower.find('>', end) + 1 or len(text))
+
+        spans.append((match.start(), end))
+        position = end
+
+
+def skipped_end(spans: list[tuple[int, int]], position: int) -> int | None:
+    """Returns the end of the span of spans holding position, or None if position is markup."""
+    # Last span starting at or before position
+    i = bisect.bisect_right(spans, (position, float('inf'))) - 1
+
+    if i >= 0 and spans[i][0] <= position < spans[i][1]:
+        return spans[i][1]
+
+    return None
+
+
+def element_end(text: str, tag: str, start: int, spans: list[tuple[int, int]]) -> int:
+    """
+    Returns the index after the closing tag of the element opened at start, or -1 if it is never closed.
+
+    Tags of the same name nested in the element are counted, so the matching closing
+    tag is found. Tags in spans, see skipped_spans(), are passed over.
+    """
+    depth = 0
+
+    for match in re.compile(rf'<(/?){tag}\b', re.IGNORECASE).finditer(text, start):
+        if skipped_end(spans, match.start()) is not None:
+            continue
+
+        depth += -1 if match.group(1) else 1
+
+        if depth == 0:
+            end = text.find('>', match.end())
+            return end + 1 if end != -1 else -1
+
+    return -1
+
+
+def find_elements(text: str, tag: str, pattern: re.Pattern, count: int, spans: list[tuple[int, int]]) -> list[str] | None:
+    """Returns the first count elements matching pattern outside of spans as HTML, or None if there are fewer."""
+    elements = []
+    position = 0
+
+    while len(elements) < count:
+        match = pattern.search(text, position)
+        if match is None:
+            return None
+
+        # An opening tag written in a script, style or comment
+        span_end = skipped_end(spans, match.start())
+        if span_end is not None:
+            position = span_end
+            continue
+
+        end = element_end(text, tag, match.start(), spans)
+        if end == -1:
+            return None
+
+        elements.append(text[match.start():end])
+        position = end
+
+    return elements
+
+
+def extract_regions(text: str, regions: list[tuple[str, re.Pattern, int, bool]]) -> str | None:
+    """
+    Returns the elements of regions, as (tag, opening tag pattern, count, required), joined in one HTML document.
+
+    The css selectors of the regions find the same elements in the returned document
+    as in text. Regions that are not required are left out if missing, as the page
+    does not always have them. Returns None if any required region is missing, the
+    caller then parses all of text.
+    """
+    fragments = []
+    spans = skipped_spans(text)
+
+    for tag, pattern, count, required in regions:
+        elements = find_elements(text, tag, pattern, count, spans)
+        if elements is None:
+            if required:
+                return None
+
+            continue
+
+        fragments += elements
+
+    return '<html><body>' + ''.join(fragments) + '</body></html>'
+
+
+# Regions of the league page: the form table and the total, home and away scoreboards
+league_regions = [
+    ('table', opening_tag('table', classes=('table',)), 1, True),
+    ('div', opening_tag('div', classes=('table-body', 'table-custom', 'competition-result')), 3, True),
+]
+
+# Regions of the team page: the recent match dates and the coach statistics,
+# which some teams have none of, see parse_coach()
+team_regions = [
+    ('div', opening_tag('div', classes=('spree-content',)), 1, True),
+    ('div', opening_tag('div', element_id='mod_coachStats'), 1, False),
+]
+
+# Regions of the results page: the table of past and upcoming matches of the team
+results_regions = [
+    ('table', opening_tag('table', classes=('table-results',)), 1, True),
+]
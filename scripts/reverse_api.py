@@ -1,6 +1,7 @@
 import requests
 import pandas as pd
 from . import config
+from .fetching import client
 from .parsing import parse_total_score, parse_home_away_score
 from typing import Callable
 
@@ -22,7 +23,12 @@ def get_score_board(url: str, headers: str, parse: Callable) -> pd.DataFrame:
     
     Returns df implemented by parse function."""
 
-    response = requests.get(url, headers=headers)
+    try:
+        response = client.get(url, headers=headers)
+
+    except requests.RequestException as e:
+        print(f"Failed to retrieve data from {url}: {e}")
+        return pd.DataFrame([])
 
     # If request successful, proceed
     if response.status_code == 200:
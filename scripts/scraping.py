@@ -1,9 +1,22 @@
+import contextvars
 import requests
+import sqlite3
+import time
+import functools
 import pandas as pd
-from datetime import datetime
+from dataclasses import replace
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 from . import config
-from .parsing import parse_scraped_scoreboard
-from selectolax.parser import HTMLParser
+from .cache import cache
+from .congestion import CongestionIndex
+from .fetching import client
+from .head_to_head import HeadToHeadIndex
+from .metrics import function_seconds, timed
+from .singleflight import SingleFlight
+from .snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot
+from .store import store
 
 # Todo: implement the integration of other Leagues
 # Need to come up with some idea on how to use the team_slug
@@ -22,210 +35,617 @@ class BeSoccerNameNotFound(Exception):
 league_slug = config.LEAGUE_SLUG
 team_slug = config.ALL_TEAMS_SLUG
 
-def fetch_league_html(league: str) -> str:
-    """Fetches the HTML content of the page containing the team's data."""
-    # Replace team name to slug
+
+@functools.cache
+def snapshot_archive():
+    """
+    Returns the snapshot archive, None if disabled in config or pyarrow is not installed.
+
+    Imported on first use, so pyarrow is only loaded when the archive is enabled.
+    """
+    if not config.SNAPSHOT_ARCHIVE:
+        return None
+
+    try:
+        from .archive import archive
+
+    except ImportError as e:
+        print(f"Snapshot archive disabled, pyarrow could not be imported: {e}")
+        return None
+
+    return archive
+
+def league_url(league: str) -> str:
+    """Returns the URL of the league page."""
+    # Replace league name to slug
     if league in league_slug.keys():
-        league = league_slug[league]
+        return config.LEAGUE_URL + league_slug[league]
 
     else:
         raise BeSoccerNameNotFound(f'Could not map {league} to slug.')
 
-    base = config.LEAGUE_URL + league
 
-    response = requests.get(base)
+@timed(function_seconds)
+def scrape_last_five_games(response_text: str) -> dict:
+    """
+    Scrapes the last five games, returns a dict with team as key and value as list of results.
 
-    if response.status_code == 200:
-        return response.text
+    Uses response_text of the league page.
+    """
+    return LeagueSnapshot.from_html(response_text).last_five_games
     
+
+def team_url(team: str) -> str:
+    """Returns the URL of the team page."""
+    # Replace team name to slug
+    if team in team_slug.keys():
+        return config.TEAM_URL + team_slug[team]
+
     else:
-        print(f"Error fetching from {base}: {response.status_code}")
-        return None 
+        raise BeSoccerNameNotFound(f'Could not map {team} to slug.')
 
 
-def scrape_last_five_games(response_text: str) -> dict:
+@timed(function_seconds)
+def scrape_match_dates(response_text: str) -> list[str]:
     """
-    Scrapes the last five games, returns a dict with team as key and value as list of results.
+    Scrapes the ISO dates of the past and upcoming games.
 
-    Uses response_text from fetch_league_html().
+    Uses response_text of the team page.
     """
+    return TeamSnapshot.from_html(response_text).match_dates
 
-    if response_text is not None:
 
-        html = HTMLParser(response_text)
+@timed(function_seconds)
+def scrape_coach(response_text: str) -> dict:
+    """
+    Gets coach data for team from html response.
+    
+    Uses response_text of the team page.
+    """
+    return TeamSnapshot.from_html(response_text).coach
+    
 
-        # Gets all rows in table
-        rows = html.css_first("table.table").css("td.name")
+@timed(function_seconds)
+def scrape_total_table(response_text: str) -> pd.DataFrame:
+    """Scrapes total table from response text.
+    
+    Uses response_text of the league page."""
+    return LeagueSnapshot.from_html(response_text).total_table
 
-        # Loop over rows
-        results = {}
-        for row in rows:
-            # Team name found in span with class team-name
-            team = row.css_first("span.team-name").text()
 
-            match_res = []
-            
-            # match results are in 5 spans with class bg-match-res
-            # the span class needs to be extracted
-            spans = row.css("span.bg-match-res")
-            
-            # Loop over spans
-            for span in spans:
-                # Get the class
-                match_res.append(span.attributes['class'].split(' ')[-1])
-                
-            results[team] = match_res
-        
-        return results
+@timed(function_seconds)
+def scrape_home_table(response_text: str) -> pd.DataFrame:
+    """Scrapes home table from response text.
     
-    else:
-        return {}
+    Uses response_text of the league page."""
+    return LeagueSnapshot.from_html(response_text).home_table
+    
+
+@timed(function_seconds)
+def scrape_away_table(response_text: str) -> pd.DataFrame:
+    """Scrapes away table from response text.
     
+    Uses response_text of the league page."""
+    return LeagueSnapshot.from_html(response_text).away_table
+
+
+def fetch_concurrently(fetch: Callable[[str], str], names: list[str], max_workers: int = config.FETCH_CONCURRENCY) -> dict:
+    """
+    Calls fetch for every name in names on a thread pool with at most max_workers in flight.
+
+    Each call runs in a copy of the context of the caller, so its requests go in the lane of the caller.
+
+    Returns dict with name as key and response text as value.
+    """
+    # Duplicates are only fetched once
+    names = list(dict.fromkeys(names))
+
+    if len(names) <= 1:
+        return {name: fetch(name) for name in names}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, fetch, name) for name in names]
+        return {name: future.result() for name, future in zip(names, futures)}
+
+
+# url -> snapshot parsed from the last 200 response of url, reused when the page is not modified
+parsed_snapshots = {}
+
+
+@timed(function_seconds)
+def fetch_snapshot(url: str, parse: Callable):
+    """
+    Fetches url with a conditional request and parses it with parse.
+
+    If the page is not modified since the last fetch, the previously parsed
+    snapshot is returned without parsing again. Returns None if the fetch failed.
+    """
+    try:
+        response = client.get(url, revalidate=True)
+
+        if response.status_code == 304 and url not in parsed_snapshots:
+            # Validators without a parsed snapshot, e.g. if parsing failed last time
+            client.forget(url)
+            response = client.get(url, revalidate=True)
+
+    except requests.RequestException as e:
+        print(f"Error fetching from {url}: {e}")
+        return None
+
+    if response.status_code == 304:
+        # Same content as the parsed snapshot, only the scrape time is new
+        snapshot = replace(parsed_snapshots[url], scraped_at=time.time())
 
-def fetch_team_html(team: str) -> str:
-    """Fetches the HTML content of the page containing the team's data."""
+    elif response.status_code == 200:
+        try:
+            snapshot = parse(response.text)
+
+        except Exception:
+            # The validators are of a page that was not parsed, a 304 must not return the previous snapshot for it
+            client.forget(url)
+            raise
+
+    else:
+        print(f"Error fetching from {url}: {response.status_code}")
+        return None
+
+    parsed_snapshots[url] = snapshot
+    return snapshot
+
+
+def fetch_league_snapshot(league: str, parse: Callable = LeagueSnapshot.from_html) -> LeagueSnapshot:
+    """Fetches and parses the league page, returns None if the fetch failed."""
+    return fetch_snapshot(league_url(league), parse)
+
+
+def fetch_team_snapshot(team: str, parse: Callable = TeamSnapshot.from_html) -> TeamSnapshot:
+    """Fetches and parses the team page, returns None if the fetch failed."""
+    return fetch_snapshot(team_url(team), parse)
+
+
+def results_url(team: str) -> str:
+    """Returns the URL of the results page of the team."""
     # Replace team name to slug
     if team in team_slug.keys():
-        team = team_slug[team]
+        return config.RESULTS_URL + team_slug[team]
 
     else:
         raise BeSoccerNameNotFound(f'Could not map {team} to slug.')
 
-    base = config.TEAM_URL + team
 
-    response = requests.get(base)
+def fetch_results_snapshot(team: str, parse: Callable = ResultsSnapshot.from_html) -> ResultsSnapshot:
+    """Fetches and parses the results page of the team, returns None if the fetch failed."""
+    # Head to head is left empty when no results page is configured
+    if config.RESULTS_URL is None:
+        return None
 
-    if response.status_code == 200:
-        return response.text
-    
-    else:
-        print(f"Error fetching from {base}: {response.status_code}")
-        return None 
+    return fetch_snapshot(results_url(team), parse)
 
 
-def scrape_games_last_week(response_text: str) -> list[str]:
+def cache_league_snapshot(league: str, snapshot: LeagueSnapshot, persist: bool = True) -> None:
     """
-    Scrapes the dates of the games in the last seven days.
+    Stores the league snapshot in the shared cache, under the league and under its id.
+
+    Entries expire the time to live after the snapshot was scraped, so a snapshot
+    loaded from the store is not taken for a fresh one.
 
-    Uses response_text from fetch_team_html().
+    With persist, the snapshot is also written to the snapshot store and appended
+    to the snapshot archive if enabled.
     """
-    dates = []
+    cache.set('league', league, snapshot, snapshot.scraped_at)
+    cache.set('snapshot', snapshot.id, snapshot, snapshot.scraped_at)
 
-    # If request failed, response_text will be none.
-    if response_text is not None:
-        html = HTMLParser(response_text)
+    if persist and store is not None:
+        try:
+            store.save_league_snapshot(league, snapshot)
+            save_validators(league_url(league), snapshot)
 
-        # Dates contained in div
-        divs = html.css_first('div.spree-content').css('div.date.color-grey2')
+        except sqlite3.Error as e:
+            print(f"Error storing snapshot of {league}: {e}")
 
-        today = datetime.today()
-        for div in divs:
-            date_string = div.text()
-            date_object = datetime.strptime(date_string, '%d %b.')
-            current_year = datetime.now().year
-            date_object = date_object.replace(year=current_year)
-            
-            # If the difference in days < 7, add to list
-            difference = today - date_object
-            days = difference.days
+    if persist and snapshot_archive() is not None:
+        snapshot_archive().append_league_snapshot(league, snapshot)
 
-            if (days < 7):
-                dates.append(date_object.strftime("%d %b. %y"))
 
-    return dates
+def cache_team_snapshot(team: str, snapshot: TeamSnapshot, persist: bool = True) -> None:
+    """
+    Stores the coach and match dates of the team snapshot in the shared cache.
 
+    Entries expire the time to live after the snapshot was scraped, see cache_league_snapshot().
+    With persist, the snapshot is also written to the snapshot store if enabled.
+    """
+    cache.set('coach', team, snapshot.coach, snapshot.scraped_at)
+    cache.set('match dates', team, snapshot.match_dates, snapshot.scraped_at)
 
-def scrape_coach(response_text: str) -> dict:
+    if persist and store is not None:
+        try:
+            store.save_team_snapshot(team, snapshot)
+            save_validators(team_url(team), snapshot)
+
+        except sqlite3.Error as e:
+            print(f"Error storing snapshot of {team}: {e}")
+
+
+def save_validators(url: str, snapshot) -> None:
+    """Stores the validators of url in the snapshot store with the snapshot parsed from it, see restore_snapshots()."""
+    validators = client.stored_validators(url)
+
+    if validators:
+        store.save_validators(snapshot.id, url, validators)
+
+
+def restore_snapshots(snapshots: list, validators: dict) -> None:
     """
-    Gets coach data for team from html response.
-    
-    Uses response_text from fetch_team_html().
+    Restores the stored validators of snapshots, by snapshot id, and the snapshots parsed from their urls.
+
+    A page answered with 304 Not Modified then returns the restored snapshot
+    without being downloaded and parsed again.
     """
+    for snapshot in snapshots:
+        if snapshot.id in validators:
+            url, snapshot_validators = validators[snapshot.id]
 
-    if response_text is not None:
-        html = HTMLParser(response_text)
+            parsed_snapshots[url] = snapshot
+            client.restore_validators(url, snapshot_validators)
 
-        div = html.css_first('div#mod_coachStats')
 
-        # In some cases, there is no coach statistics on the site.
-        # In such a case "div" will be None and we get an AttributeError
-        # when calling css_first().
-        try:
-            name = div.css_first('p.mb5').text()
+def load_persisted_snapshots(max_age: float = config.SNAPSHOT_DB_MAX_AGE) -> int:
+    """
+    Fills the shared cache with the latest stored snapshots younger than max_age seconds.
+
+    Lets a restarted app serve without scraping first, and revalidate the pages of
+    the snapshots. Returns the number of snapshots loaded.
+    """
+    if store is None:
+        return 0
+
+    try:
+        leagues = store.latest_league_snapshots(max_age)
+        teams = store.latest_team_snapshots(max_age)
+        validators = store.validators([snapshot.id for snapshot in (*leagues.values(), *teams.values())])
+
+    except sqlite3.Error as e:
+        print(f"Error loading stored snapshots: {e}")
+        return 0
+
+    # Already in the store, so not written back. Kept until their time to live after
+    # they were scraped ran out, then fetched again
+    for league, snapshot in leagues.items():
+        cache_league_snapshot(league, snapshot, persist=False)
+
+    for team, snapshot in teams.items():
+        cache_team_snapshot(team, snapshot, persist=False)
+
+    restore_snapshots([*leagues.values(), *teams.values()], validators)
+
+    return len(leagues) + len(teams)
+
+
+# Fetches in flight, shared by concurrent callbacks asking for the same page
+flights = SingleFlight()
+
+
+@flights.shared('league')
+def refresh_league(league: str) -> LeagueSnapshot:
+    """
+    Fetches the league snapshot and caches it, returns None if the fetch failed.
+
+    Concurrent calls for the same league in this process share one fetch and parse,
+    including its result if it failed. The refresh lock of the league is held, so with
+    a cache shared by several workers only one of them fetches, the others find the
+    snapshot in the cache once it is released.
+    """
+    with cache.refresh_lock('league', league):
+        snapshot = cache.get('league', league)
+
+        if snapshot is None:
+            snapshot = fetch_league_snapshot(league)
+
+            # Failed fetches are not cached so the next call tries again
+            if snapshot is not None:
+                cache_league_snapshot(league, snapshot)
+
+        return snapshot
+
+
+@timed(function_seconds)
+def get_leagues_data(leagues: list[str]) -> dict:
+    """
+    Returns dict with league as key and snapshot with total, home and away scoreboards 
+    and last five games as value.
+
+    Served from the shared cache, so a league page is only fetched and parsed
+    once per time to live no matter how many sessions ask for it. Leagues missing
+    from the cache are fetched concurrently.
+    """
+    snapshots = {league: cache.get('league', league) for league in leagues}
+
+    missing = [league for league, snapshot in snapshots.items() if snapshot is None]
 
-            data = div.css('div.main-line.mt10.mb5')
+    for league, snapshot in fetch_concurrently(refresh_league, missing).items():
+        snapshots[league] = snapshot if snapshot is not None else LeagueSnapshot.from_html(None)
 
-            matches = int(data[0].text())
-            wins = int(data[1].text())
-            draws = int(data[2].text())
-            losses = int(data[3].text())
+    return snapshots
 
-            return {
-                'name': name,
-                'matches': matches,
-                'wins': wins,
-                'draws': draws,
-                'losses': losses,
+
+def get_league_data(league: str) -> LeagueSnapshot:
+    """Returns snapshot with total, home and away scoreboards and last five games for league."""
+    return get_leagues_data([league])[league]
+
+
+def get_league_data_as_of(league: str, day: date) -> LeagueSnapshot:
+    """
+    Returns the last archived snapshot of league scraped on or before day, None if there is none.
+
+    Read from the snapshot archive without scraping. The snapshot is cached under
+    its id, so resolve_league_snapshot() finds it too.
+    """
+    if snapshot_archive() is None:
+        return None
+
+    # Snapshots of today may still be appended, so only past days are cached
+    key = f"{league}@{day.isoformat()}" if day < date.today() else None
+    snapshot = cache.get('snapshot', key) if key is not None else None
+
+    if snapshot is None:
+        snapshot = snapshot_archive().league_snapshot_as_of(league, day)
+
+        if snapshot is None:
+            return None
+
+        if key is not None:
+            cache.set('snapshot', key, snapshot)
+
+        cache.set('snapshot', snapshot.id, snapshot)
+
+    return snapshot
+
+
+def archived_dates(league: str) -> list[date]:
+    """Returns the dates with archived snapshots of league, oldest first."""
+    if snapshot_archive() is None:
+        return []
+
+    return snapshot_archive().dates(league)
+
+
+def resolve_league_snapshot(league: str, snapshot_id: str) -> LeagueSnapshot:
+    """
+    Returns the league snapshot with snapshot_id.
+
+    Falls back to the current snapshot of league if the id is unknown or evicted.
+    """
+    snapshot = cache.get('snapshot', snapshot_id) if snapshot_id is not None else None
+
+    if snapshot is None:
+        snapshot = get_league_data(league)
+
+    return snapshot
+
+
+def cached_team_data(team: str) -> dict:
+    """Returns dict with coach and match dates of team from the shared cache, None for missing entries."""
+    return {
+        'coach': cache.get('coach', team),
+        'match dates': cache.get('match dates', team),
+    }
+
+
+def empty_team_data() -> dict:
+    """Returns dict with coach and match dates of a team page that could not be fetched."""
+    snapshot = TeamSnapshot.from_html(None)
+
+    return {
+        'coach': snapshot.coach,
+        'match dates': snapshot.match_dates,
+    }
+
+
+@flights.shared('team')
+def refresh_team(team: str) -> dict:
+    """
+    Fetches the team snapshot and caches it, returns dict with coach and match dates or None if the fetch failed.
+
+    Shares concurrent calls and holds the refresh lock of the team, see refresh_league().
+    """
+    with cache.refresh_lock('team', team):
+        data = cached_team_data(team)
+
+        if None in data.values():
+            snapshot = fetch_team_snapshot(team)
+
+            # Failed fetches are not cached so the next call tries again
+            if snapshot is None:
+                return None
+
+            cache_team_snapshot(team, snapshot)
+            data = {
+                'coach': snapshot.coach,
+                'match dates': snapshot.match_dates,
             }
-        
-        except AttributeError:
-            return {}
 
-    else:
-        return {}
-    
+        return data
 
-def scrape_total_table(response_text: str) -> pd.DataFrame:
-    """Scrapes total table from response text.
-    
-    Uses response_text from fetch_league_html()."""
 
-    if response_text is not None:
-        html = HTMLParser(response_text)
+@timed(function_seconds)
+def get_teams_data(teams: list[str]) -> dict:
+    """
+    Returns dict with team as key and dict with coach and match dates as value.
 
-        table_div = html.css_first("div.table-body.table-custom.competition-result")
+    Served from the shared cache, a team page is fetched again when any of its
+    entries expired. Teams missing from the cache are fetched concurrently.
+    """
+    teams_data = {team: cached_team_data(team) for team in teams}
 
-        df = parse_scraped_scoreboard(table_div)
+    missing = [team for team, data in teams_data.items() if None in data.values()]
 
-        return df
+    for team, data in fetch_concurrently(refresh_team, missing).items():
+        teams_data[team] = data if data is not None else empty_team_data()
 
-    else:
-        return pd.DataFrame([])
+    return teams_data
 
 
-def scrape_home_table(response_text: str) -> pd.DataFrame:
-    """Scrapes home table from response text.
-    
-    Uses response_text from fetch_league_html()."""
+def get_cached_teams_data(teams: list[str]) -> dict:
+    """
+    Returns dict with team as key and dict with coach and match dates as value, from the shared cache only.
 
-    if response_text is not None:
-        html = HTMLParser(response_text)
+    Nothing is fetched, entries missing from the cache are those of an empty team page.
+    """
+    teams_data = {}
 
-        table_div = html.css("div.table-body.table-custom.competition-result")[1]
+    for team in teams:
+        data, empty = cached_team_data(team), empty_team_data()
+        teams_data[team] = {key: value if value is not None else empty[key] for key, value in data.items()}
 
-        df = parse_scraped_scoreboard(table_div)
+    return teams_data
 
-        return df
 
-    else:
-        return pd.DataFrame([])
-    
+def build_congestion_index(league: str) -> CongestionIndex:
+    """
+    Builds the congestion index of league from the match dates of its teams in the shared cache and caches it.
 
-def scrape_away_table(response_text: str) -> pd.DataFrame:
-    """Scrapes away table from response text.
-    
-    Uses response_text from fetch_league_html()."""
+    Teams without cached match dates are left out.
+    """
+    match_dates = {}
 
-    if response_text is not None:
-        html = HTMLParser(response_text)
+    for team in config.LEAGUE_TEAMS.get(league, []):
+        dates = cache.get('match dates', team)
 
-        table_div = html.css("div.table-body.table-custom.competition-result")[2]
+        if dates is not None:
+            match_dates[team] = dates
 
-        df = parse_scraped_scoreboard(table_div)
+    index = CongestionIndex(match_dates)
+    cache.set('congestion', league, index)
 
-        return df
+    return index
 
-    else:
-        return pd.DataFrame([])
 
+def get_congestion_index(league: str, teams: list[str]) -> CongestionIndex:
+    """
+    Returns the congestion index of league, built once per refresh of its teams.
+
+    Rebuilt from the cache if any of teams is missing, e.g. when they were fetched
+    after the index was built. Call after get_teams_data(teams).
+    """
+    index = cache.get('congestion', league)
+
+    if index is None or any(team not in index for team in teams):
+        index = build_congestion_index(league)
+
+    return index
+
+
+def cache_results_snapshot(team: str, snapshot: ResultsSnapshot) -> None:
+    """Stores the results of the results snapshot in the shared cache."""
+    cache.set('results', team, snapshot.results)
+
+
+def cached_results(team: str) -> list:
+    """Returns the cached results of team, empty if its last fetch failed, or None if not cached."""
+    results = cache.get('results', team)
+
+    if results is None:
+        results = cache.get('failed results', team)
+
+    return results
+
+
+@flights.shared('results')
+def refresh_results(team: str) -> list:
+    """
+    Fetches the results snapshot of team and caches it, returns its results or None if the fetch failed.
+
+    Shares concurrent calls and holds the refresh lock of the team, see refresh_league().
+    """
+    with cache.refresh_lock('results', team):
+        results = cached_results(team)
+
+        if results is None:
+            snapshot = fetch_results_snapshot(team)
+
+            # Failed fetches are cached as no results for a short time, so the head-to-head
+            # index knows the team and callbacks do not fetch the page on every call
+            if snapshot is None:
+                cache.set('failed results', team, [])
+                return None
+
+            cache_results_snapshot(team, snapshot)
+            results = snapshot.results
+
+        return results
+
+
+@timed(function_seconds)
+def get_results_data(teams: list[str]) -> dict:
+    """
+    Returns dict with team as key and list of its past results as value.
+
+    Served from the shared cache, teams missing from the cache are fetched concurrently.
+    """
+    results = {team: cached_results(team) for team in teams}
+
+    missing = [team for team, team_results in results.items() if team_results is None]
+
+    for team, team_results in fetch_concurrently(refresh_results, missing).items():
+        results[team] = team_results if team_results is not None else ResultsSnapshot.from_html(None).results
+
+    return results
+
+
+def cached_league_results(league: str) -> dict:
+    """
+    Returns dict with team of league as key and its results in the shared cache as value.
+
+    Teams without cached results are left out, teams whose results page could not
+    be fetched are kept without results.
+    """
+    results = {}
+
+    for team in config.LEAGUE_TEAMS.get(league, []):
+        team_results = cached_results(team)
+
+        if team_results is not None:
+            results[team] = team_results
+
+    return results
+
+
+def build_head_to_head_index(league: str) -> HeadToHeadIndex:
+    """Builds the head-to-head index of league from the results of its teams in the shared cache and caches it."""
+    index = HeadToHeadIndex(cached_league_results(league), config.HEAD_TO_HEAD_MEETINGS)
+    cache.set('head to head', league, index)
+
+    return index
+
+
+def get_head_to_head_index(league: str, teams: list[str]) -> HeadToHeadIndex:
+    """
+    Returns the head-to-head index of league, built once per refresh of the results of its teams.
+
+    If any of teams is missing, e.g. before the first warm-up, their results are
+    fetched and the index is rebuilt from the cache.
+    """
+    # No results page is configured, so there is nothing to fetch or index
+    if config.RESULTS_URL is None:
+        return HeadToHeadIndex({}, config.HEAD_TO_HEAD_MEETINGS)
+
+    index = cache.get('head to head', league)
+
+    if index is None or any(team not in index for team in teams):
+        get_results_data(teams)
+        index = build_head_to_head_index(league)
+
+    return index
+
+
+def get_head_to_head_index_as_of(league: str, day: date) -> HeadToHeadIndex:
+    """
+    Returns the head-to-head index of league with only the meetings played on or before day.
+
+    Built from the results in the shared cache without fetching, for tables as of a
+    past date. Not cached, as every date gives another index.
+    """
+    if config.RESULTS_URL is None:
+        return HeadToHeadIndex({}, config.HEAD_TO_HEAD_MEETINGS)
 
+    return HeadToHeadIndex(cached_league_results(league), config.HEAD_TO_HEAD_MEETINGS, until=day)
@@ -0,0 +1,270 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any
+from .metrics import cache_requests
+
+"""
+Cache shared by all worker processes on a host, e.g. the gunicorn workers serving run.py.
+
+Every entry is a file in one directory. Values are pickled with protocol 5, which
+keeps the arrays of DataFrames out of band, and the arrays are written after the
+pickle. Readers map the file into memory and unpickle with the arrays pointing into
+the mapping, so the tables are not copied and pages are shared by all workers.
+
+Uses fcntl, so it only runs on Unix like gunicorn itself.
+"""
+
+# magic, stored_at, expires_at, pickle length, number of out-of-band buffers
+header = struct.Struct('<8sddQI')
+magic = b'FSCACHE1'
+
+# Out-of-band buffers start on multiples of this, so arrays are aligned for numpy
+alignment = 64
+
+# Expired and surplus entries are removed every this many set() calls
+prune_every = 64
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def private_directory(directory: str) -> None:
+    """
+    Creates directory with mode 0700, or checks an existing one is a directory of the current user.
+
+    Entries are unpickled, so a file planted by another user could run code in the
+    workers. Raises PermissionError if directory is a link, owned by another user or
+    writable by others.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(f"Cache directory {directory} must be a directory owned by the current user and not writable by others")
+
+    os.chmod(directory, 0o700)
+
+
+class SharedCache:
+    """
+    Cache with the interface of TTLCache, kept in files under directory.
+
+    Entries expire after the time to live configured for their kind. When there
+    are more than max_entries, the entries stored longest ago are removed.
+    """
+
+    def __init__(self, directory: str, ttl: dict, max_entries: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        private_directory(directory)
+
+        # path -> ((inode, mtime), stored_at, expires_at, value) of files already read by this process,
+        # ordered from least to most recently read and bounded by max_entries
+        self._decoded = {}
+        self._lock = threading.Lock()
+        self._sets = 0
+
+    def _path(self, kind: str, key: str, suffix: str = '.entry') -> str:
+        digest = hashlib.sha1(f"{kind}\0{key}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    def _read(self, path: str) -> tuple | None:
+        """Returns (stored_at, expires_at, value) of the entry file at path, or None if missing or unreadable."""
+        try:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                identity = (stat.st_ino, stat.st_mtime_ns)
+
+                with self._lock:
+                    decoded = self._decoded.pop(path, None)
+
+                    # Unchanged since last read, the value is already unpickled
+                    if decoded is not None and decoded[0] == identity:
+                        self._decoded[path] = decoded
+                        return decoded[1:]
+
+                # The mapping stays open as long as an array points into it
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            view = memoryview(mapped)
+            file_magic, stored_at, expires_at, pickle_length, n_buffers = header.unpack_from(view)
+
+            if file_magic != magic:
+                return None
+
+            offset = header.size
+            lengths = struct.unpack_from(f'<{n_buffers}Q', view, offset)
+            offset += 8 * n_buffers
+
+            pickled = view[offset:offset + pickle_length]
+            offset += pickle_length
+
+            buffers = []
+            for length in lengths:
+                offset = aligned(offset)
+                buffers.append(view[offset:offset + length])
+                offset += length
+
+            value = pickle.loads(pickled, buffers=buffers)
+
+        except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            with self._lock:
+                self._decoded.pop(path, None)
+            return None
+
+        with self._lock:
+            self._decoded[path] = (identity, stored_at, expires_at, value)
+            full = len(self._decoded) > self.max_entries
+
+        if full:
+            self._forget_decoded()
+
+        return stored_at, expires_at, value
+
+    def _forget_decoded(self) -> None:
+        """
+        Drops the decoded values whose file was replaced or removed, e.g. by another worker,
+        then the least recently read while there are more than max_entries.
+
+        Lets the arrays of dropped values, and the mappings they point into, be freed.
+        """
+        with self._lock:
+            identities = [(path, decoded[0]) for path, decoded in self._decoded.items()]
+
+        stale = []
+        for path, identity in identities:
+            try:
+                info = os.stat(path)
+                if (info.st_ino, info.st_mtime_ns) != identity:
+                    stale.append(path)
+
+            except FileNotFoundError:
+                stale.append(path)
+
+        with self._lock:
+            for path in stale:
+                self._decoded.pop(path, None)
+
+            while len(self._decoded) > self.max_entries:
+                self._decoded.pop(next(iter(self._decoded)))
+
+    def get(self, kind: str, key: str) -> Any:
+        """Returns cached value, or None if missing or expired."""
+        entry = self._read(self._path(kind, key))
+
+        if entry is None or entry[1] < time.time():
+            self.misses += 1
+            cache_requests.inc(kind, 'miss')
+            return None
+
+        self.hits += 1
+        cache_requests.inc(kind, 'hit')
+        return entry[2]
+
+    def set(self, kind: str, key: str, value: Any, stored_at: float = None) -> None:
+        """Stores value with the time to live of kind after stored_at, visible to all workers once written, see TTLCache.set()."""
+        if stored_at is None:
+            stored_at = time.time()
+
+        buffers = []
+        pickled = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header.pack(magic, stored_at, stored_at + self.ttl[kind], len(pickled), len(raws)))
+                f.write(struct.pack(f'<{len(raws)}Q', *(raw.nbytes for raw in raws)))
+                f.write(pickled)
+
+                for raw in raws:
+                    f.write(b'\0' * (aligned(f.tell()) - f.tell()))
+                    f.write(raw)
+
+            # Readers see either the old or the new file, never a half written one
+            os.replace(temporary_path, self._path(kind, key))
+
+        except OSError:
+            os.remove(temporary_path)
+            raise
+
+        with self._lock:
+            self._sets += 1
+            prune = self._sets % prune_every == 0
+
+        if prune:
+            self.prune()
+
+    def last_refreshed(self, kind: str, key: str) -> float | None:
+        """Returns the timestamp when the entry was stored, or None if not cached."""
+        entry = self._read(self._path(kind, key))
+        return entry[0] if entry is not None else None
+
+    @contextmanager
+    def refresh_lock(self, kind: str, key: str):
+        """
+        Holds a lock on the entry across all workers while the block runs.
+
+        Lets one worker fetch a missing entry while the others wait for it instead of fetching too.
+        """
+        with open(self._path(kind, key, '.lock'), 'wb') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def prune(self) -> None:
+        """Removes expired entries, then the entries stored longest ago while there are more than max_entries."""
+        now = time.time()
+        entries = []
+
+        for name in os.listdir(self.directory):
+            if not name.endswith('.entry'):
+                continue
+
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as f:
+                    _, stored_at, expires_at, _, _ = header.unpack(f.read(header.size))
+
+            except (OSError, struct.error):
+                continue
+
+            if expires_at < now:
+                self._remove(path)
+            else:
+                entries.append((stored_at, path))
+
+        for _, path in sorted(entries)[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path)
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self._decoded.pop(path, None)
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith('.entry'):
+                self._remove(os.path.join(self.directory, name))
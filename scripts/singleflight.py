@@ -0,0 +1,64 @@
+import functools
+import threading
+from concurrent.futures import Future
+from .metrics import coalesced_calls
+
+
+class SingleFlight:
+    """
+    Lets concurrent calls for the same key share one call in flight.
+
+    The first call for a key runs, calls for the key arriving before it returns wait
+    for it and get the same result, or the same exception.
+    """
+
+    def __init__(self):
+        # key -> Future of the call in flight
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        # Number of calls that waited for a call in flight instead of running
+        self.coalesced = 0
+
+    def do(self, key: tuple, function, *args):
+        """Returns function(*args), or the result of the call in flight for key."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+
+            if leader:
+                future = self._calls[key] = Future()
+
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            coalesced_calls.inc(key[0])
+            return future.result()
+
+        try:
+            result = function(*args)
+
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        else:
+            future.set_result(result)
+            return result
+
+        finally:
+            # Calls from here on run again
+            with self._lock:
+                del self._calls[key]
+
+    def shared(self, kind: str):
+        """Decorator sharing concurrent calls of a function of one name, keyed by (kind, name)."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(name: str):
+                return self.do((kind, name), function, name)
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import time
+import pandas as pd
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+from selectolax.parser import HTMLParser
+from .metrics import empty_pages, function_seconds, region_fallbacks, timed
+from .parsing import parse_scraped_scoreboard, parse_last_five_games, parse_coach, parse_match_dates, parse_results
+from .regions import extract_regions, league_regions, team_regions, results_regions
+
+
+def content_id(*parts: str) -> str:
+    """Returns a hex digest of parts, the same for snapshots parsed to the same content."""
+    digest = hashlib.blake2b(digest_size=16)
+
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def parse_regions(response_text: str, regions: list, page: str, valid: Callable[[HTMLParser], bool]) -> HTMLParser:
+    """
+    Returns the tree of the regions of response_text, see extract_regions().
+
+    Falls back to the tree of the whole page if a region is not found, or if the
+    tree of the regions is not valid, e.g. when markup the pre-scan does not expect
+    cut a region short.
+    """
+    fragments = extract_regions(response_text, regions)
+
+    if fragments is not None:
+        html = HTMLParser(fragments)
+
+        if valid(html):
+            return html
+
+    region_fallbacks.inc(page)
+    return HTMLParser(response_text)
+
+
+def valid_league(html: HTMLParser) -> bool:
+    """Returns True if html has the form table and the total, home and away scoreboards."""
+    return len(html.css("div.table-body.table-custom.competition-result")) == 3 and html.css_first("table.table") is not None
+
+
+def valid_team(html: HTMLParser) -> bool:
+    """Returns True if html has the spree content with the match dates."""
+    return html.css_first('div.spree-content') is not None
+
+
+def valid_results(html: HTMLParser) -> bool:
+    """Returns True if html has the results table."""
+    return html.css_first('table.table-results') is not None
+
+
+@dataclass
+class LeagueSnapshot:
+    """
+    Everything scraped from one league page.
+
+    Only the regions holding the tables are parsed, every selector is run on the same tree.
+    """
+    total_table: pd.DataFrame
+    home_table: pd.DataFrame
+    away_table: pd.DataFrame
+    last_five_games: dict
+    scraped_at: float = field(default_factory=time.time)
+    # Small key that sessions keep instead of the tables, see resolve_league_snapshot()
+    # Derived from the content, so an unchanged page is stored and archived once
+    id: str = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = content_id(*(table.to_json(orient='split') for table in (self.total_table, self.home_table, self.away_table)),
+                                 json.dumps(self.last_five_games, sort_keys=True))
+
+    @classmethod
+    @timed(function_seconds)
+    def from_html(cls, response_text: str) -> "LeagueSnapshot":
+        """
+        Parses response_text of the league page.
+
+        If request failed, response_text is None and the snapshot is empty.
+        """
+        if response_text is None:
+            return cls(pd.DataFrame([]), pd.DataFrame([]), pd.DataFrame([]), {})
+
+        html = parse_regions(response_text, league_regions, 'league', valid_league)
+
+        # Total, home and away tables in that order
+        table_divs = html.css("div.table-body.table-custom.competition-result")
+
+        return cls(
+            total_table=parse_scraped_scoreboard(table_divs[0]),
+            home_table=parse_scraped_scoreboard(table_divs[1]),
+            away_table=parse_scraped_scoreboard(table_divs[2]),
+            last_five_games=parse_last_five_games(html.css_first("table.table")),
+        )
+
+
+@dataclass
+class TeamSnapshot:
+    """
+    Everything scraped from one team page.
+
+    Only the regions holding the dates and the coach are parsed, every selector is run on the same tree.
+    """
+    coach: dict
+    scraped_at: float = field(default_factory=time.time)
+    # Derived from the content, so an unchanged page is only stored once
+    id: str = None
+    # ISO dates of the past and upcoming games on the page, see CongestionIndex
+    match_dates: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = content_id(json.dumps(self.coach, sort_keys=True), json.dumps(self.match_dates))
+
+    @classmethod
+    @timed(function_seconds)
+    def from_html(cls, response_text: str) -> "TeamSnapshot":
+        """
+        Parses response_text of the team page.
+
+        If request failed, response_text is None and the snapshot is empty.
+        """
+        if response_text is None:
+            return cls({})
+
+        html = parse_regions(response_text, team_regions, 'team', valid_team)
+
+        # Dates contained in div
+        date_divs = html.css_first('div.spree-content').css('div.date.color-grey2')
+
+        return cls(
+            coach=parse_coach(html.css_first('div#mod_coachStats')),
+            match_dates=parse_match_dates(date_divs, datetime.today().date()),
+        )
+
+
+@dataclass
+class ResultsSnapshot:
+    """
+    Played matches on the results page of one team.
+
+    Only the results table is parsed, see HeadToHeadIndex for how the results are used.
+    """
+    # (ISO date, home team, away team, home goals, away goals)
+    results: list[tuple]
+    scraped_at: float = field(default_factory=time.time)
+
+    @classmethod
+    @timed(function_seconds)
+    def from_html(cls, response_text: str) -> "ResultsSnapshot":
+        """
+        Parses response_text from the results page of a team.
+
+        If request failed, response_text is None and the snapshot is empty.
+        """
+        if response_text is None:
+            return cls([])
+
+        html = parse_regions(response_text, results_regions, 'results', valid_results)
+        results = parse_results(html.css_first('table.table-results'))
+
+        # The selectors were not checked against a recorded results page, so an empty
+        # page is reported instead of leaving the head-to-head column silently empty
+        if not results:
+            empty_pages.inc('results')
+            print("No played matches found on results page, see tests/test_parsing.py to check the selectors on recorded pages")
+
+        return cls(results=results)
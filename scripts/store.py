@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+import time
+import pandas as pd
+from io import StringIO
+from . import config
+from .parsing import index_by_name
+from .snapshot import LeagueSnapshot, TeamSnapshot
+
+
+class SnapshotStore:
+    """
+    SQLite file keeping every league and team snapshot, keyed by name and scrape time.
+
+    Lets a restarted app fill the cache without scraping and keeps a history of
+    every distinct snapshot taken, snapshots with the same content share their id and are stored once. Runs in WAL mode, so readers are not blocked by writes.
+
+    The HTTP validators of each snapshot are kept too, so a restarted app revalidates
+    the pages of the loaded snapshots instead of downloading them again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        # sqlite3 connections can not be shared between threads, each thread gets its own
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS league_snapshots (
+                id TEXT PRIMARY KEY,
+                league TEXT NOT NULL,
+                scraped_at REAL NOT NULL,
+                total_table TEXT NOT NULL,
+                home_table TEXT NOT NULL,
+                away_table TEXT NOT NULL,
+                last_five_games TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS league_snapshots_league ON league_snapshots (league, scraped_at);
+
+            CREATE TABLE IF NOT EXISTS team_snapshots (
+                id TEXT NOT NULL,
+                team TEXT NOT NULL,
+                scraped_at REAL NOT NULL,
+                coach TEXT NOT NULL,
+                match_dates TEXT NOT NULL,
+                PRIMARY KEY (id, team)
+            );
+            CREATE INDEX IF NOT EXISTS team_snapshots_team ON team_snapshots (team, scraped_at);
+
+            CREATE TABLE IF NOT EXISTS http_validators (
+                snapshot_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                validators TEXT NOT NULL
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        if not hasattr(self._local, 'connection'):
+            self._local.connection = sqlite3.connect(self.path, timeout=10)
+            self._local.connection.execute("PRAGMA synchronous=NORMAL")
+
+        return self._local.connection
+
+    def save_league_snapshot(self, league: str, snapshot: LeagueSnapshot) -> None:
+        """Stores the snapshot, only the scrape time is updated if a snapshot with the same id is already stored."""
+        with self._connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO league_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET scraped_at = excluded.scraped_at
+                """,
+                (snapshot.id, league, snapshot.scraped_at, snapshot.total_table.to_json(orient='records'),
+                 snapshot.home_table.to_json(orient='records'), snapshot.away_table.to_json(orient='records'),
+                 json.dumps(snapshot.last_five_games)),
+            )
+
+    def save_team_snapshot(self, team: str, snapshot: TeamSnapshot) -> None:
+        """Stores the snapshot, only the scrape time is updated if a snapshot with the same id is already stored for team."""
+        with self._connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO team_snapshots VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id, team) DO UPDATE SET scraped_at = excluded.scraped_at
+                """,
+                (snapshot.id, team, snapshot.scraped_at, json.dumps(snapshot.coach), json.dumps(snapshot.match_dates)),
+            )
+
+    def save_validators(self, snapshot_id: str, url: str, validators: dict) -> None:
+        """Stores the validators (ETag and Last-Modified) of the response the snapshot was parsed from."""
+        with self._connection() as connection:
+            connection.execute(
+                """
+                INSERT INTO http_validators VALUES (?, ?, ?)
+                ON CONFLICT (snapshot_id) DO UPDATE SET url = excluded.url, validators = excluded.validators
+                """,
+                (snapshot_id, url, json.dumps(validators)),
+            )
+
+    def validators(self, snapshot_ids: list[str]) -> dict:
+        """Returns dict with snapshot id as key and (url, validators) of the snapshot as value, for the ids stored."""
+        rows = self._connection().execute(
+            f"SELECT snapshot_id, url, validators FROM http_validators WHERE snapshot_id IN ({', '.join('?' * len(snapshot_ids))})",
+            snapshot_ids,
+        )
+
+        return {snapshot_id: (url, json.loads(validators)) for snapshot_id, url, validators in rows}
+
+    def latest_league_snapshots(self, max_age: float) -> dict:
+        """Returns dict with league as key and its latest snapshot younger than max_age seconds as value."""
+        rows = self._connection().execute(
+            """
+            SELECT league, MAX(scraped_at), id, total_table, home_table, away_table, last_five_games
+            FROM league_snapshots WHERE scraped_at > ? GROUP BY league
+            """,
+            (time.time() - max_age,),
+        )
+
+        return {
+            league: LeagueSnapshot(
+                total_table=read_table(total_table),
+                home_table=read_table(home_table),
+                away_table=read_table(away_table),
+                last_five_games=json.loads(last_five_games),
+                scraped_at=scraped_at,
+                id=snapshot_id,
+            )
+            for league, scraped_at, snapshot_id, total_table, home_table, away_table, last_five_games in rows
+        }
+
+    def latest_team_snapshots(self, max_age: float) -> dict:
+        """Returns dict with team as key and its latest snapshot younger than max_age seconds as value."""
+        rows = self._connection().execute(
+            """
+            SELECT team, MAX(scraped_at), id, coach, match_dates
+            FROM team_snapshots WHERE scraped_at > ? GROUP BY team
+            """,
+            (time.time() - max_age,),
+        )
+
+        return {
+            team: TeamSnapshot(coach=json.loads(coach), scraped_at=scraped_at, id=snapshot_id, match_dates=json.loads(match_dates))
+            for team, scraped_at, snapshot_id, coach, match_dates in rows
+        }
+
+
+def read_table(records: str) -> pd.DataFrame:
+    """Reads a scoreboard stored as JSON records, indexed by team name as when scraped."""
+    return index_by_name(pd.read_json(StringIO(records), orient='records'))
+
+
+# None when disabled in config
+store = SnapshotStore(config.SNAPSHOT_DB) if config.SNAPSHOT_DB else None
@@ -0,0 +1,239 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+from . import config
+from .cache import cache
+from .governor import in_lane
+from .scraping import (fetch_concurrently, fetch_league_snapshot, fetch_team_snapshot, fetch_results_snapshot, cache_league_snapshot,
+                       cache_team_snapshot, cache_results_snapshot, build_congestion_index, build_head_to_head_index)
+from .snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot
+
+
+class WarmupScheduler:
+    """
+    Periodically pre-scrapes every configured league and team into the shared cache.
+
+    Pages are fetched on threads and parsed on a process pool, so parsing does not
+    hold the GIL away from the threads handling requests.
+
+    With the shared cache, only one process per host refreshes, the one holding the
+    lock file lock_path, e.g. one of the gunicorn workers. The others check every
+    interval and take over when the process holding it exits. With the memory cache
+    every process refreshes its own cache.
+
+    A page that fails to fetch or parse is logged and skipped, the other pages and
+    the indexes are still refreshed.
+    """
+
+    def __init__(self, interval: int, processes: int, lock_path: str):
+        self.interval = interval
+        self.processes = processes
+        self.lock_path = lock_path
+
+        # (kind, name) -> timestamp of the last successful refresh
+        self.last_refresh = {}
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+        # Open while this process holds the lock, closing it releases the lock
+        self._lock_file = None
+
+    def start(self) -> None:
+        """Starts the background thread, does nothing if already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def _lead(self) -> bool:
+        """Returns True if this process refreshes, with the shared cache if it holds the warm-up lock of the host, taking it if it is free."""
+        if self._lock_file is not None:
+            return True
+
+        # Each worker has its own cache, which only it can warm
+        if config.CACHE_BACKEND != 'shared':
+            return True
+
+        try:
+            import fcntl
+
+        except ImportError:
+            # Windows, where gunicorn does not run, so there are no other workers
+            return True
+
+        # Only imported when used, it needs fcntl too
+        from .shared_cache import private_directory
+
+        private_directory(os.path.dirname(self.lock_path))
+        lock_file = open(self.lock_path, 'wb')
+
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        except BlockingIOError:
+            # Another process on the host refreshes
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    def _run(self) -> None:
+        while not self._lead():
+            if self._stop.wait(self.interval):
+                return
+
+        # Spawned processes do not inherit the locks of the threads serving requests
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            self._pool = pool
+
+            while not self._stop.is_set():
+                try:
+                    # Requests of callbacks are sent before the refresh requests
+                    with in_lane('background'):
+                        self.refresh()
+
+                except Exception as e:
+                    print(f"Warm-up refresh failed: {e}")
+
+                self._stop.wait(self.interval)
+
+        self._pool = None
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def refresh(self) -> None:
+        """
+        Fetches and parses every league, team and results page and stores them in the cache.
+
+        Pages stored less than half an interval ago are skipped, with a cache shared
+        by several workers they were refreshed by the warm-up of another worker.
+        """
+        self.refresh_leagues([league for league in config.LEAGUE_SLUG if not self.recently_refreshed('league', league)])
+        self.refresh_teams([team for team in config.ALL_TEAMS_SLUG if not self.recently_refreshed('match dates', team)])
+
+        # Past results change slowly, so they are refreshed once per half their time to live
+        if config.RESULTS_URL is not None:
+            self.refresh_results([team for team in config.ALL_TEAMS_SLUG if not self.recently_refreshed('results', team, config.CACHE_TTL['results'] / 2)])
+
+        # Once per refresh, from the match dates and results of all teams
+        for league in config.LEAGUE_TEAMS:
+            build_congestion_index(league)
+
+            if config.RESULTS_URL is not None:
+                build_head_to_head_index(league)
+
+    def recently_refreshed(self, kind: str, key: str, age: float = None) -> bool:
+        """Returns True if the entry was stored less than age seconds ago, by default half an interval."""
+        refreshed = cache.last_refreshed(kind, key)
+        return refreshed is not None and time.time() - refreshed < (age if age is not None else self.interval / 2)
+
+    def refresh_leagues(self, leagues: list[str]) -> None:
+        parse = self._parser(LeagueSnapshot.from_html)
+        snapshots = fetch_concurrently(
+            lambda league: self._refresh_locked('league', league, 'league', None, lambda: fetch_league_snapshot(league, parse), cache_league_snapshot),
+            leagues,
+        )
+
+        for league, snapshot in snapshots.items():
+            if snapshot is not None:
+                self.last_refresh[('league', league)] = snapshot.scraped_at
+
+    def refresh_teams(self, teams: list[str]) -> None:
+        # Several team names can map to the same slug, fetch each page once
+        names_by_slug = {}
+        for team in teams:
+            names_by_slug.setdefault(config.ALL_TEAMS_SLUG[team], []).append(team)
+
+        def store(team: str, snapshot: TeamSnapshot) -> None:
+            for name in names_by_slug[config.ALL_TEAMS_SLUG[team]]:
+                cache_team_snapshot(name, snapshot)
+
+        parse = self._parser(TeamSnapshot.from_html)
+        snapshots = fetch_concurrently(
+            lambda team: self._refresh_locked('team', team, 'match dates', None, lambda: fetch_team_snapshot(team, parse), store),
+            [names[0] for names in names_by_slug.values()],
+        )
+
+        for team, snapshot in snapshots.items():
+            if snapshot is not None:
+                for name in names_by_slug[config.ALL_TEAMS_SLUG[team]]:
+                    self.last_refresh[('team', name)] = snapshot.scraped_at
+
+    def refresh_results(self, teams: list[str]) -> None:
+        parse = self._parser(ResultsSnapshot.from_html)
+        snapshots = fetch_concurrently(
+            lambda team: self._refresh_locked('results', team, 'results', config.CACHE_TTL['results'] / 2,
+                                              lambda: fetch_results_snapshot(team, parse), cache_results_snapshot),
+            teams,
+        )
+
+        for team, snapshot in snapshots.items():
+            if snapshot is not None:
+                self.last_refresh[('results', team)] = snapshot.scraped_at
+
+    def _refresh_locked(self, kind: str, key: str, fresh_kind: str, age: float, fetch: Callable, store: Callable):
+        """
+        Fetches the snapshot of key with fetch and stores it with store while holding the refresh lock of (kind, key).
+
+        The lock is the one taken by the callbacks, so with a cache shared by several
+        workers each page is fetched by one worker. Returns None without fetching if
+        the fresh_kind entry of key was refreshed less than age seconds ago once the
+        lock is held, e.g. by another worker at a cold boot, or if the page failed to
+        fetch or parse.
+        """
+        with cache.refresh_lock(kind, key):
+            if self.recently_refreshed(fresh_kind, key, age):
+                return None
+
+            # One page, e.g. with a date that does not parse, must not stop the refresh of the others
+            try:
+                snapshot = fetch()
+
+                if snapshot is not None:
+                    store(key, snapshot)
+
+            except Exception as e:
+                print(f"Warm-up refresh of {kind} {key} failed: {e}")
+                return None
+
+            return snapshot
+
+    def _parser(self, parse):
+        """
+        Returns parse running on the process pool, or parse itself when refresh() is called directly.
+
+        Pages that are not modified since the last refresh are never sent to the pool.
+        """
+        pool = self._pool
+
+        if pool is None:
+            return parse
+
+        return lambda text: pool.submit(parse, text).result()
+
+
+scheduler = WarmupScheduler(config.WARMUP_INTERVAL, config.WARMUP_PROCESSES, os.path.join(config.CACHE_DIR, 'warmup.lock'))
+
+
+def start_warmup() -> None:
+    """Starts the warm-up scheduler if enabled in config."""
+    # Processes spawned by the parse pool import the main module again, only start in the parent.
+    # Every worker starts the scheduler, but only one per host refreshes, see WarmupScheduler
+    if config.WARMUP_ENABLED and multiprocessing.parent_process() is None:
+        scheduler.start()
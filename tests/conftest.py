@@ -0,0 +1,7 @@
+import os
+
+# Set before the modules read config: no snapshot store, archive or warm-up in tests
+os.environ.setdefault("SNAPSHOT_DB", "")
+os.environ.setdefault("SNAPSHOT_ARCHIVE", "")
+os.environ.setdefault("WARMUP_ENABLED", "0")
+os.environ.setdefault("PRELOAD_ENABLED", "0")
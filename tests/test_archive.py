@@ -0,0 +1,76 @@
+from dataclasses import replace
+from datetime import date, datetime
+from pathlib import Path
+import pandas as pd
+import pytest
+from scripts.snapshot import LeagueSnapshot
+
+# The archive is optional and needs pyarrow
+pytest.importorskip('pyarrow')
+
+from scripts.archive import SnapshotArchive, season_of
+
+pages = Path(__file__).parent.parent / 'benchmarks' / 'pages'
+
+
+def scraped(day: date, hour: int = 12) -> float:
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    return LeagueSnapshot.from_html((pages / 'premier-league.html').read_text(encoding='utf-8'))
+
+
+@pytest.fixture
+def archive(tmp_path, snapshot):
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+
+    # Points as they were on each day
+    for day, points, snapshot_id in [(date(2024, 9, 30), 10, 'september'), (date(2024, 10, 14), 20, 'october')]:
+        archive.append_league_snapshot('Premier League', replace(
+            snapshot, total_table=snapshot.total_table.assign(points=points), scraped_at=scraped(day), id=snapshot_id))
+
+    return archive
+
+
+def test_season_starts_in_july():
+    assert season_of(date(2024, 7, 1)) == '2024-25'
+    assert season_of(date(2025, 6, 30)) == '2024-25'
+    assert season_of(date(2099, 8, 1)) == '2099-00'
+
+
+def test_snapshot_as_of_is_the_last_on_or_before_the_date(archive, snapshot):
+    assert archive.league_snapshot_as_of('Premier League', date(2024, 9, 29)) is None
+    assert archive.league_snapshot_as_of('Premier League', date(2024, 9, 30)).id == 'september'
+    assert archive.league_snapshot_as_of('Premier League', date(2024, 10, 13)).id == 'september'
+
+    latest = archive.league_snapshot_as_of('Premier League', date(2025, 3, 1))
+    assert latest.id == 'october'
+    assert (latest.total_table['points'] == 20).all()
+
+    pd.testing.assert_frame_equal(latest.home_table, snapshot.home_table, check_dtype=False)
+    assert latest.last_five_games == snapshot.last_five_games
+
+
+def test_snapshot_is_archived_once_per_day(archive, snapshot):
+    again = replace(snapshot, scraped_at=scraped(date(2024, 10, 14), 18), id='october')
+
+    assert not archive.append_league_snapshot('Premier League', again)
+    assert archive.dates('Premier League') == [date(2024, 9, 30), date(2024, 10, 14)]
+
+
+def test_history_reads_the_dates_and_teams_asked_for(archive, snapshot):
+    teams = list(snapshot.total_table['name'][:2])
+    history = archive.history('Premier League', date(2024, 10, 1), date(2024, 10, 31), ['points'], teams=teams)
+
+    assert list(history.columns) == ['date', 'scraped_at', 'name', 'points']
+    assert sorted(history['name']) == sorted(teams)
+    assert set(history['date']) == {'2024-10-14'}
+    assert (history['points'] == 20).all()
+
+
+def test_league_without_snapshots(archive):
+    assert archive.dates('Championship') == []
+    assert archive.league_snapshot_as_of('Championship', date(2024, 10, 14)) is None
+    assert archive.history('Championship', date(2024, 10, 1), date(2024, 10, 31), ['points']).empty
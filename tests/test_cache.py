@@ -0,0 +1,62 @@
+import time
+import pytest
+from scripts.cache import TTLCache
+from scripts.shared_cache import SharedCache
+
+ttl = {'league': 60, 'coach': 3600}
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def cache(request, tmp_path):
+    if request.param == 'shared':
+        return SharedCache(str(tmp_path / 'cache'), ttl, max_entries=10)
+
+    return TTLCache(ttl, max_entries=10)
+
+
+def test_entry_expires_the_time_to_live_after_it_was_stored(cache):
+    cache.set('league', 'Premier League', 'current')
+    assert cache.get('league', 'Premier League') == 'current'
+
+    # Scraped longer ago than the time to live of its kind, e.g. loaded from the snapshot store
+    cache.set('league', 'Championship', 'old', stored_at=time.time() - 61)
+    assert cache.get('league', 'Championship') is None
+
+
+def test_time_to_live_is_per_kind(cache):
+    stored_at = time.time() - 120
+
+    cache.set('league', 'Arsenal', 'league entry', stored_at)
+    cache.set('coach', 'Arsenal', 'coach entry', stored_at)
+
+    assert cache.get('league', 'Arsenal') is None
+    assert cache.get('coach', 'Arsenal') == 'coach entry'
+
+
+def test_last_refreshed_is_the_time_stored(cache):
+    stored_at = time.time() - 30
+    cache.set('coach', 'Arsenal', 'coach entry', stored_at)
+
+    assert cache.last_refreshed('coach', 'Arsenal') == pytest.approx(stored_at)
+    assert cache.last_refreshed('coach', 'Chelsea') is None
+
+
+def test_entries_are_counted_as_hits_and_misses(cache):
+    cache.set('coach', 'Arsenal', 'coach entry')
+
+    cache.get('coach', 'Arsenal')
+    cache.get('coach', 'Chelsea')
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl, max_entries=2)
+
+    cache.set('coach', 'Arsenal', 1)
+    cache.set('coach', 'Chelsea', 2)
+    cache.get('coach', 'Arsenal')
+    cache.set('coach', 'Fulham', 3)
+
+    assert cache.get('coach', 'Chelsea') is None
+    assert cache.get('coach', 'Arsenal') == 1
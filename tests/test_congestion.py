@@ -0,0 +1,53 @@
+from datetime import date
+from scripts.congestion import CongestionIndex
+
+today = date(2024, 10, 20)
+
+# Given out of order, as on the team pages
+index = CongestionIndex({
+    'Arsenal': ['2024-10-19', '2024-09-28', '2024-10-14', '2024-10-13', '2024-10-23'],
+    'Chelsea': ['2024-10-15'],
+    'Fulham': [],
+})
+
+
+def test_recent_games_are_counted_back_from_today_latest_first():
+    # 13 October is eight days back, the game on 23 October is upcoming
+    assert index.recent_games('Arsenal', 7, today) == [date(2024, 10, 19), date(2024, 10, 14)]
+    assert index.games_in_last('Arsenal', 7, today) == 2
+
+    assert index.recent_games('Arsenal', 8, today) == [date(2024, 10, 19), date(2024, 10, 14), date(2024, 10, 13)]
+    assert index.games_in_last('Arsenal', 8, today) == 3
+
+
+def test_game_today_is_a_recent_game_but_not_rest():
+    assert index.recent_games('Arsenal', 1, date(2024, 10, 19)) == [date(2024, 10, 19)]
+
+    # Days of rest before a fixture on 19 October are counted from 14 October
+    assert index.rest_days('Arsenal', date(2024, 10, 19)) == 5
+
+
+def test_rest_days_of_both_teams():
+    assert index.rest_days_pair('Arsenal', 'Chelsea', today) == (1, 5)
+
+
+def test_team_without_games_has_no_rest_days():
+    for team in ('Fulham', 'Brentford'):
+        assert index.recent_games(team, 7, today) == []
+        assert index.games_in_last(team, 7, today) == 0
+        assert index.rest_days(team, today) is None
+
+    assert 'Fulham' in index
+    assert 'Brentford' not in index
+
+
+def test_covering_keeps_teams_whose_games_reach_back_to_the_days_asked_about():
+    covering = index.covering(7, today)
+
+    # Chelsea's first listed game is in the last week, it may have played earlier
+    assert 'Arsenal' in covering
+    assert 'Chelsea' not in covering
+    assert 'Fulham' not in covering
+
+    assert covering.recent_games('Arsenal', 7, today) == index.recent_games('Arsenal', 7, today)
+    assert 'Chelsea' in index.covering(7, date(2024, 10, 21))
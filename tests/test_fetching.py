@@ -0,0 +1,92 @@
+import pytest
+import requests
+from scripts import scraping
+from scripts.fetching import client
+from scripts.snapshot import TeamSnapshot
+
+page = '<html><body><div class="spree-content"><div class="date color-grey2">5 Oct.</div></div></body></html>'
+
+
+class Site:
+    """Answers requests to a page with ETag "v1", and 304 Not Modified when the request sends it."""
+
+    def __init__(self):
+        self.requests = []
+
+    def send(self, url: str, headers: dict) -> requests.Response:
+        self.requests.append(dict(headers or {}))
+
+        response = requests.Response()
+        response.url = url
+        response.encoding = 'utf-8'
+
+        if (headers or {}).get('if-none-match') == '"v1"':
+            response.status_code, response._content = 304, b''
+        else:
+            response.status_code, response._content = 200, page.encode('utf-8')
+            response.headers['ETag'] = '"v1"'
+
+        return response
+
+
+@pytest.fixture
+def site(monkeypatch):
+    site = Site()
+    monkeypatch.setattr(client, '_send', site.send)
+
+    return site
+
+
+def counting(parse):
+    """Returns parse counting its calls in .calls."""
+    def counted(response_text):
+        counted.calls += 1
+        return parse(response_text)
+
+    counted.calls = 0
+    return counted
+
+
+def test_page_not_modified_reuses_the_parsed_snapshot(site):
+    url = 'https://example.com/team/not-modified'
+    parse = counting(TeamSnapshot.from_html)
+
+    first = scraping.fetch_snapshot(url, parse)
+    second = scraping.fetch_snapshot(url, parse)
+
+    assert site.requests[1]['if-none-match'] == '"v1"'
+    assert parse.calls == 1
+    assert second.match_dates == first.match_dates
+    assert second.scraped_at >= first.scraped_at
+
+
+def test_page_is_downloaded_again_when_parsing_failed(site):
+    url = 'https://example.com/team/parse-failed'
+
+    def failing(response_text):
+        raise ValueError("unexpected markup")
+
+    with pytest.raises(ValueError):
+        scraping.fetch_snapshot(url, failing)
+
+    assert client.stored_validators(url) == {}
+
+    parse = counting(TeamSnapshot.from_html)
+    scraping.fetch_snapshot(url, parse)
+
+    assert 'if-none-match' not in site.requests[1]
+    assert parse.calls == 1
+
+
+def test_not_modified_without_a_parsed_snapshot_downloads_the_page(site):
+    url = 'https://example.com/team/restored'
+
+    # Validators restored from the snapshot store, with no snapshot parsed in this process
+    client.restore_validators(url, {'etag': '"v1"'})
+
+    parse = counting(TeamSnapshot.from_html)
+    snapshot = scraping.fetch_snapshot(url, parse)
+
+    assert [headers.get('if-none-match') for headers in site.requests] == ['"v1"', None]
+    assert parse.calls == 1
+    assert snapshot is not None
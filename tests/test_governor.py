@@ -0,0 +1,77 @@
+import threading
+import time
+from scripts.governor import RateGovernor, in_lane
+from .test_singleflight import wait_for
+
+host = 'example.com'
+
+
+def test_interactive_lane_is_served_before_background():
+    governor = RateGovernor(rate=1000, burst=1000, max_in_flight=1)
+    order = []
+
+    def request(lane: str, name: str):
+        with in_lane(lane):
+            with governor.slot(host):
+                order.append(name)
+
+    # The only slot is held, so every request below waits
+    governor.acquire(host)
+
+    threads = []
+    for lane, name in [('background', 'background 1'), ('background', 'background 2'), ('interactive', 'interactive')]:
+        thread = threading.Thread(target=request, args=(lane, name))
+        thread.start()
+        threads.append(thread)
+
+        # Queued one at a time, so the arrival order is known
+        wait_for(lambda: len(governor._hosts[host].queue) == len(threads))
+
+    governor.release(host)
+
+    for thread in threads:
+        thread.join()
+
+    assert order == ['interactive', 'background 1', 'background 2']
+
+
+def test_requests_are_sent_at_the_rate_after_the_burst():
+    rate, burst, requests = 20, 2, 8
+    governor = RateGovernor(rate=rate, burst=burst, max_in_flight=4)
+
+    start = time.monotonic()
+    for _ in range(requests):
+        with governor.slot(host):
+            pass
+
+    elapsed = time.monotonic() - start
+
+    # The burst goes at once, every request after it waits for a token
+    assert (requests - burst) / rate * 0.9 <= elapsed < (requests - burst) / rate + 0.5
+
+
+def test_in_flight_requests_are_limited():
+    governor = RateGovernor(rate=1000, burst=1000, max_in_flight=2)
+    in_flight = []
+    most = []
+    lock = threading.Lock()
+
+    def request():
+        with governor.slot(host):
+            with lock:
+                in_flight.append(1)
+                most.append(len(in_flight))
+
+            time.sleep(0.02)
+
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert max(most) == 2
@@ -0,0 +1,60 @@
+from datetime import date
+from scripts.head_to_head import HeadToHeadIndex
+
+# The same match is listed on the results pages of both teams
+results = {
+    'Arsenal': [
+        ('2024-10-05', 'Arsenal', 'Chelsea', 2, 1),
+        ('2024-04-20', 'Chelsea', 'Arsenal', 0, 0),
+        ('2023-12-02', 'Arsenal', 'Chelsea', 1, 3),
+        ('2023-05-01', 'Chelsea', 'Arsenal', 1, 2),
+        ('2024-09-28', 'Arsenal', 'Fulham', 4, 0),
+    ],
+    'Chelsea': [
+        ('2024-04-20', 'Chelsea', 'Arsenal', 0, 0),
+        ('2024-10-05', 'Arsenal', 'Chelsea', 2, 1),
+    ],
+    'Brentford': [],
+}
+
+
+def test_meetings_are_counted_once_latest_first():
+    index = HeadToHeadIndex(results, meetings=3)
+
+    assert index.meetings('Arsenal', 'Chelsea') == (
+        ('2024-10-05', 'Arsenal', 'Chelsea', 2, 1),
+        ('2024-04-20', 'Chelsea', 'Arsenal', 0, 0),
+        ('2023-12-02', 'Arsenal', 'Chelsea', 1, 3),
+    )
+    assert index.meetings('Chelsea', 'Arsenal') == index.meetings('Arsenal', 'Chelsea')
+
+
+def test_scores_and_record_are_from_the_side_of_the_team():
+    index = HeadToHeadIndex(results, meetings=3)
+
+    assert index.scores('Arsenal', 'Chelsea') == [(2, 1), (0, 0), (1, 3)]
+    assert index.scores('Chelsea', 'Arsenal') == [(1, 2), (0, 0), (3, 1)]
+
+    assert index.record('Arsenal', 'Chelsea') == (1, 1, 1)
+    assert index.record('Chelsea', 'Arsenal') == (1, 1, 1)
+
+
+def test_number_of_meetings_is_limited():
+    assert len(HeadToHeadIndex(results, meetings=1).meetings('Arsenal', 'Chelsea')) == 1
+    assert len(HeadToHeadIndex(results, meetings=10).meetings('Arsenal', 'Chelsea')) == 4
+
+
+def test_until_leaves_out_later_meetings():
+    index = HeadToHeadIndex(results, meetings=3, until=date(2024, 10, 4))
+
+    assert [meeting[0] for meeting in index.meetings('Arsenal', 'Chelsea')] == ['2024-04-20', '2023-12-02', '2023-05-01']
+    assert index.meetings('Arsenal', 'Fulham') == (('2024-09-28', 'Arsenal', 'Fulham', 4, 0),)
+
+
+def test_team_without_meetings_is_known():
+    index = HeadToHeadIndex(results)
+
+    assert 'Brentford' in index
+    assert 'Fulham' not in index
+    assert index.meetings('Brentford', 'Arsenal') == ()
+    assert index.record('Brentford', 'Arsenal') == (0, 0, 0)
@@ -0,0 +1,52 @@
+from datetime import date
+import pytest
+from scripts.metrics import empty_pages
+from scripts.parsing import parse_match_date
+from scripts.snapshot import ResultsSnapshot
+from benchmarks.recorded import recorded_pages
+
+
+@pytest.mark.parametrize('text, today, expected', [
+    # Same year
+    ('16 Oct.', date(2024, 10, 20), date(2024, 10, 16)),
+    # Played in December, seen in January
+    ('30 Dec.', date(2025, 1, 2), date(2024, 12, 30)),
+    # Upcoming in January, seen in December
+    ('2 Jan.', date(2024, 12, 30), date(2025, 1, 2)),
+    ('28 Dec.', date(2024, 12, 30), date(2024, 12, 28)),
+])
+def test_year_closest_to_today_is_used(text, today, expected):
+    assert parse_match_date(text, today) == expected
+
+
+@pytest.mark.parametrize('today, expected', [
+    (date(2024, 3, 2), date(2024, 2, 29)),
+    # Only 2024 is a leap year among the candidates
+    (date(2025, 1, 10), date(2024, 2, 29)),
+    (date(2023, 12, 20), date(2024, 2, 29)),
+])
+def test_29_february_is_put_in_a_leap_year(today, expected):
+    assert parse_match_date('29 Feb.', today) == expected
+
+
+def test_text_that_is_not_a_date_raises():
+    with pytest.raises(ValueError):
+        parse_match_date('Postponed', date(2024, 10, 20))
+
+
+# The results selectors were written without a page of the site, record pages to check them, see benchmarks/recorded.py
+@pytest.mark.parametrize('path', recorded_pages('results'), ids=lambda path: path.name)
+def test_recorded_results_pages_have_played_matches(path):
+    results = ResultsSnapshot.from_html(path.read_text(encoding='utf-8')).results
+
+    assert results
+    for match_date, home, away, home_goals, away_goals in results:
+        date.fromisoformat(match_date)
+        assert home and away and home != away
+
+
+def test_results_page_without_played_matches_is_counted():
+    before = empty_pages._values.get(('results',), 0)
+
+    assert ResultsSnapshot.from_html('<html><body><table class="table"></table></body></html>').results == []
+    assert empty_pages._values[('results',)] == before + 1
@@ -0,0 +1,90 @@
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import pytest
+from selectolax.parser import HTMLParser
+from scripts.parsing import parse_scraped_scoreboard, parse_last_five_games, parse_coach, parse_match_dates, parse_results
+from scripts.regions import extract_regions, league_regions, team_regions, results_regions
+from scripts.metrics import region_fallbacks
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot, ResultsSnapshot, parse_regions, valid_league
+from benchmarks.recorded import recorded_pages
+
+pages = Path(__file__).parent.parent / 'benchmarks' / 'pages'
+
+# Pages written by benchmarks.fixtures, and the pages of the site if recorded, see benchmarks/recorded.py
+league_pages = [pages / 'premier-league.html', pages / 'championship.html', *recorded_pages('league')]
+team_pages = [pages / 'team.html', *recorded_pages('team')]
+results_pages = [pages / 'results.html', *recorded_pages('results')]
+
+
+def read_page(name: str) -> str:
+    return (pages / name).read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('path', league_pages, ids=lambda path: path.name)
+def test_league_regions_parse_like_the_full_page(path):
+    text = path.read_text(encoding='utf-8')
+    assert extract_regions(text, league_regions) is not None
+
+    html = HTMLParser(text)
+    table_divs = html.css("div.table-body.table-custom.competition-result")
+    snapshot = LeagueSnapshot.from_html(text)
+
+    for table_div, table in zip(table_divs, (snapshot.total_table, snapshot.home_table, snapshot.away_table)):
+        pd.testing.assert_frame_equal(parse_scraped_scoreboard(table_div), table)
+
+    assert parse_last_five_games(html.css_first("table.table")) == snapshot.last_five_games
+
+
+def test_closing_tags_in_scripts_and_comments_are_skipped():
+    text = read_page('premier-league.html')
+    first_row = text.index('<tr class="row-body">', text.index('competition-result'))
+    text = text[:first_row] + '<script>document.write("</div>")</script><!-- </div> -->' + text[first_row:]
+
+    snapshot = LeagueSnapshot.from_html(text)
+
+    assert len(snapshot.total_table) == len(snapshot.home_table) == len(snapshot.away_table) == 20
+
+
+def test_regions_that_do_not_parse_fall_back_to_the_full_page():
+    text = read_page('premier-league.html')
+
+    fallbacks = region_fallbacks._values.get(('league',), 0)
+    html = parse_regions(text, league_regions, 'league', lambda html: False)
+
+    assert region_fallbacks._values.get(('league',), 0) == fallbacks + 1
+    assert valid_league(html)
+
+
+@pytest.mark.parametrize('path', team_pages, ids=lambda path: path.name)
+def test_team_regions_parse_like_the_full_page(path):
+    text = path.read_text(encoding='utf-8')
+    assert extract_regions(text, team_regions) is not None
+
+    html = HTMLParser(text)
+    snapshot = TeamSnapshot.from_html(text)
+
+    assert parse_coach(html.css_first('div#mod_coachStats')) == snapshot.coach
+    assert parse_match_dates(html.css_first('div.spree-content').css('div.date.color-grey2'), datetime.today().date()) == snapshot.match_dates
+
+
+def test_team_page_without_coach_is_not_parsed_in_full():
+    text = read_page('team.html').replace('id="mod_coachStats"', 'id="mod_otherStats"')
+    assert extract_regions(text, team_regions) is not None
+
+    fallbacks = region_fallbacks._values.get(('team',), 0)
+    snapshot = TeamSnapshot.from_html(text)
+
+    assert region_fallbacks._values.get(('team',), 0) == fallbacks
+    assert snapshot.coach == {}
+    assert snapshot.match_dates == TeamSnapshot.from_html(read_page('team.html')).match_dates
+
+
+@pytest.mark.parametrize('path', results_pages, ids=lambda path: path.name)
+def test_results_regions_parse_like_the_full_page(path):
+    text = path.read_text(encoding='utf-8')
+    assert extract_regions(text, results_regions) is not None
+
+    html = HTMLParser(text)
+
+    assert parse_results(html.css_first('table.table-results')) == ResultsSnapshot.from_html(text).results
@@ -0,0 +1,85 @@
+import threading
+import time
+import pytest
+from scripts.singleflight import SingleFlight
+
+callers = 5
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    """Waits until condition() is true, fails the test after timeout seconds."""
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def run_concurrently(flights: SingleFlight, function) -> list:
+    """Calls function for the same key from several threads at once, returns what each call returned or raised."""
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = flights.do(('league', 'Premier League'), function)
+
+        except Exception as e:
+            outcome = e
+
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return outcomes
+
+
+def test_concurrent_calls_share_one_result():
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        # Returns once the other callers wait for this call
+        wait_for(lambda: flights.coalesced == callers - 1)
+        return object()
+
+    outcomes = run_concurrently(flights, fetch)
+
+    assert len(calls) == 1
+    assert len({id(outcome) for outcome in outcomes}) == 1
+    assert flights._calls == {}
+
+
+def test_concurrent_calls_share_one_exception():
+    flights = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        wait_for(lambda: flights.coalesced == callers - 1)
+        raise RuntimeError("parse failed")
+
+    outcomes = run_concurrently(flights, fetch)
+
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert len({id(outcome) for outcome in outcomes}) == 1
+
+
+def test_calls_after_a_failure_run_again():
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("parse failed")
+
+    with pytest.raises(RuntimeError):
+        flights.do(('league', 'Premier League'), fail)
+
+    assert flights.do(('league', 'Premier League'), lambda: 'snapshot') == 'snapshot'
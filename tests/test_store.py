@@ -0,0 +1,69 @@
+import time
+from pathlib import Path
+import pandas as pd
+from scripts.snapshot import LeagueSnapshot, TeamSnapshot
+from scripts.store import SnapshotStore
+
+pages = Path(__file__).parent.parent / 'benchmarks' / 'pages'
+
+
+def test_league_snapshot_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    snapshot = LeagueSnapshot.from_html((pages / 'premier-league.html').read_text(encoding='utf-8'))
+
+    store.save_league_snapshot('Premier League', snapshot)
+    loaded = store.latest_league_snapshots(max_age=60)['Premier League']
+
+    for table, loaded_table in zip((snapshot.total_table, snapshot.home_table, snapshot.away_table),
+                                   (loaded.total_table, loaded.home_table, loaded.away_table)):
+        pd.testing.assert_frame_equal(table, loaded_table)
+
+    assert loaded.last_five_games == snapshot.last_five_games
+    assert (loaded.id, loaded.scraped_at) == (snapshot.id, snapshot.scraped_at)
+
+
+def test_team_snapshot_round_trip_keeps_the_latest(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    older = TeamSnapshot(coach={'name': 'Old'}, match_dates=['2024-10-01'], scraped_at=time.time() - 10, id='older')
+    newer = TeamSnapshot(coach={'name': 'New'}, match_dates=['2024-10-01', '2024-10-05'], id='newer')
+
+    store.save_team_snapshot('Arsenal', older)
+    store.save_team_snapshot('Arsenal', newer)
+
+    assert store.latest_team_snapshots(max_age=60) == {'Arsenal': newer}
+
+
+def test_same_snapshot_is_stored_once_with_the_latest_scrape_time(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    snapshot = TeamSnapshot(coach={'name': 'Coach'}, match_dates=[], scraped_at=time.time() - 10, id='same')
+
+    store.save_team_snapshot('Arsenal', snapshot)
+    store.save_team_snapshot('Arsenal', TeamSnapshot(coach={'name': 'Coach'}, match_dates=[], id='same'))
+
+    rows = store._connection().execute("SELECT COUNT(*), MAX(scraped_at) FROM team_snapshots").fetchone()
+    assert rows[0] == 1
+    assert rows[1] > snapshot.scraped_at
+
+
+def test_snapshots_older_than_max_age_are_not_loaded(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    store.save_team_snapshot('Arsenal', TeamSnapshot(coach={}, match_dates=[], scraped_at=time.time() - 120))
+
+    assert store.latest_team_snapshots(max_age=60) == {}
+
+
+def test_validators_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    store.save_validators('id', 'https://example.com/team/arsenal', {'ETag': '"v1"'})
+
+    assert store.validators(['id', 'unknown']) == {'id': ('https://example.com/team/arsenal', {'ETag': '"v1"'})}
+
+
+def test_snapshots_parsed_from_an_unchanged_page_are_stored_once(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots.db'))
+    text = (pages / 'premier-league.html').read_text(encoding='utf-8')
+
+    store.save_league_snapshot('Premier League', LeagueSnapshot.from_html(text))
+    store.save_league_snapshot('Premier League', LeagueSnapshot.from_html(text))
+
+    assert store._connection().execute("SELECT COUNT(*) FROM league_snapshots").fetchone()[0] == 1